@@ -0,0 +1,31 @@
+"""add bp_email_sent table
+
+Revision ID: 3e7a91c2d4b8
+Revises: 98435330ef3e
+Create Date: 2026-10-16 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e7a91c2d4b8'
+down_revision = '98435330ef3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per user per day a blood pressure alert email was sent
+    op.create_table(
+        'bp_email_sent',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('sent_date', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'sent_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bp_email_sent')
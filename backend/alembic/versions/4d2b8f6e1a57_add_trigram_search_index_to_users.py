@@ -0,0 +1,32 @@
+"""add trigram search index to users
+
+Revision ID: 4d2b8f6e1a57
+Revises: 7c4f2e8a9b13
+Create Date: 2026-10-16 11:24:05.318842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2b8f6e1a57'
+down_revision = '7c4f2e8a9b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Trigram GIN index so substring search (ILIKE '%term%') over names and
+    # email can use an index instead of scanning every user
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_users_search_trgm',
+        'users',
+        [sa.text("lower(first_name || ' ' || last_name || ' ' || email) gin_trgm_ops")],
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_search_trgm', 'users')
@@ -0,0 +1,46 @@
+"""add partial indexes for live hospitalization lists
+
+Revision ID: 5c8a2e6f9d41
+Revises: 9b4f1c7e2d38
+Create Date: 2026-10-16 18:12:47.209815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c8a2e6f9d41'
+down_revision = '9b4f1c7e2d38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Live hospitalizations in list order (admission_date DESC, id DESC),
+    # overall and per patient; soft-deleted rows stay out of both
+    op.create_index(
+        'ix_hospitalizations_admission_live',
+        'hospitalizations',
+        [sa.text('admission_date DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_hospitalizations_patient_live',
+        'hospitalizations',
+        ['patient_id', sa.text('admission_date DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    # The composite primary key leads with hospitalization_id, so lookups
+    # by doctor had no index
+    op.create_index(
+        'ix_hospitalization_doctors_doctor_id',
+        'hospitalization_doctors',
+        ['doctor_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hospitalization_doctors_doctor_id', 'hospitalization_doctors')
+    op.drop_index('ix_hospitalizations_patient_live', 'hospitalizations')
+    op.drop_index('ix_hospitalizations_admission_live', 'hospitalizations')
@@ -0,0 +1,33 @@
+"""add trigram index to doctor_id
+
+Revision ID: 6a1e5c9d3f20
+Revises: 4d2b8f6e1a57
+Create Date: 2026-10-16 13:08:41.772305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a1e5c9d3f20'
+down_revision = '4d2b8f6e1a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Doctor search matches ILIKE '%term%' on doctor_id; names and email are
+    # covered by ix_users_search_trgm
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_doctors_doctor_id_trgm',
+        'doctors',
+        ['doctor_id'],
+        postgresql_using='gin',
+        postgresql_ops={'doctor_id': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_doctors_doctor_id_trgm', 'doctors')
@@ -0,0 +1,31 @@
+"""add partial index for high-risk blood pressure readings
+
+Revision ID: 7c4f2e8a9b13
+Revises: 3e7a91c2d4b8
+Create Date: 2026-10-16 10:02:17.540126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4f2e8a9b13'
+down_revision = '3e7a91c2d4b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only rows with systolic > 120 are indexed, so high-risk listings per
+    # user read a small index instead of filtering every reading
+    op.create_index(
+        'ix_bp_high_risk',
+        'blood_pressure_checks',
+        ['user_id', 'reading_date'],
+        postgresql_where=sa.text('systolic > 120')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bp_high_risk', 'blood_pressure_checks')
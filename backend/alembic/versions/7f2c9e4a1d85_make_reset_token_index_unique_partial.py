@@ -0,0 +1,34 @@
+"""make reset token index unique and partial
+
+Revision ID: 7f2c9e4a1d85
+Revises: e3d7a1b94c62
+Create Date: 2026-10-16 18:40:22.913406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f2c9e4a1d85'
+down_revision = 'e3d7a1b94c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Reset lookups filter on a live user's token, so index only users with
+    # an outstanding token; uniqueness guards against token reuse
+    op.drop_index('ix_users_reset_token', table_name='users')
+    op.create_index(
+        'ix_users_reset_token',
+        'users',
+        ['reset_token'],
+        unique=True,
+        postgresql_where=sa.text('reset_token IS NOT NULL AND deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_reset_token', table_name='users')
+    op.create_index('ix_users_reset_token', 'users', ['reset_token'], unique=False)
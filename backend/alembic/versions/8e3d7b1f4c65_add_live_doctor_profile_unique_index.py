@@ -0,0 +1,31 @@
+"""add unique index for one live doctor profile per user
+
+Revision ID: 8e3d7b1f4c65
+Revises: 6a1e5c9d3f20
+Create Date: 2026-10-16 14:41:19.205733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3d7b1f4c65'
+down_revision = '6a1e5c9d3f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Soft-deleted profiles are kept, so only live rows must be unique
+    op.create_index(
+        'ux_doctors_user_id_live',
+        'doctors',
+        ['user_id'],
+        unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_doctors_user_id_live', 'doctors')
@@ -0,0 +1,31 @@
+"""add partial index for paginated role listings
+
+Revision ID: 9b4f1c7e2d38
+Revises: 8e3d7b1f4c65
+Create Date: 2026-10-16 15:52:33.481096
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4f1c7e2d38'
+down_revision = '8e3d7b1f4c65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Live users of a role in list order (created_at DESC, id DESC), so the
+    # paginated doctor list streams rows from the index instead of sorting
+    op.create_index(
+        'ix_users_role_created_live',
+        'users',
+        ['role', sa.text('created_at DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_role_created_live', 'users')
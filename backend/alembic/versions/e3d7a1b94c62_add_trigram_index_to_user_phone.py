@@ -0,0 +1,33 @@
+"""add trigram index to user phone
+
+Revision ID: e3d7a1b94c62
+Revises: 5c8a2e6f9d41
+Create Date: 2026-10-16 18:31:05.448120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3d7a1b94c62'
+down_revision = '5c8a2e6f9d41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Patient search matches ILIKE '%term%' on phone; names and email are
+    # covered by ix_users_search_trgm
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_users_phone_trgm',
+        'users',
+        ['phone'],
+        postgresql_using='gin',
+        postgresql_ops={'phone': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_phone_trgm', 'users')
@@ -1,18 +1,99 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session, make_transient_to_detached
 from datetime import datetime
 import models
 from database import get_db
+from core.cache import invalidate_list_counts, invalidate_medical_staff_list, invalidate_user, user_cache
 from core.security import verify_password, get_password_hash, create_access_token, decode_token
 
 security = HTTPBearer(auto_error=False)
 
+_USER_COLUMNS = tuple(attr.key for attr in inspect(models.User).column_attrs)
+
+
+def _load_user(db: Session, username: str):
+    """
+    Return the user for username attached to db, using the user cache.
+    
+    The cache holds plain column values rather than ORM instances so no
+    state is shared between sessions; on a hit the row is rebuilt as a
+    persistent instance without a SELECT, so handlers can still modify and
+    commit current_user as usual.
+    """
+    snapshot = user_cache.get(username)
+    if snapshot is not None:
+        user = models.User(**{
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in snapshot.items()
+        })
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+    
+    user = db.query(models.User).filter(models.User.username == username).first()
+    if user is not None:
+        user_cache.set(username, {key: getattr(user, key) for key in _USER_COLUMNS})
+    return user
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    """
+    Drop cached snapshots whenever a user row is written through the ORM.
+    
+    The hook fires at flush, before the write is visible to other
+    transactions, so a concurrent request could still cache the old row;
+    the usernames are dropped again once the session commits.
+    """
+    usernames = {target.username, *inspect(target).attrs.username.history.deleted}
+    for username in usernames:
+        invalidate_user(username)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault("dirty_usernames", set()).update(usernames)
+
+
+@event.listens_for(models.User, "after_insert")
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user_lists(mapper, connection, target):
+    """Mark cached user list totals and pages for clearing when the session commits"""
+    session = inspect(target).session
+    if session is not None:
+        session.info["user_lists_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    """Clear the user caches for rows written in the transaction that just committed"""
+    for username in session.info.pop("dirty_usernames", ()):
+        invalidate_user(username)
+    if session.info.pop("user_lists_dirty", False):
+        invalidate_list_counts()
+        invalidate_medical_staff_list()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_users(session):
+    """Forget writes that were rolled back; nothing cached depends on them"""
+    session.info.pop("dirty_usernames", None)
+    session.info.pop("user_lists_dirty", None)
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security), 
     db: Session = Depends(get_db)
 ) -> models.User:
-    """Get current authenticated user and validate session"""
+    """
+    Get current authenticated user and validate session.
+    
+    FastAPI caches dependency results per request, so the role checks in
+    core.dependencies and a handler that also declares this dependency share
+    a single call; no extra per-request memoization is needed.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -46,7 +127,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = _load_user(db, username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,36 +141,52 @@ def get_current_user(
             detail="User account has been deleted",
         )
     
-    # Validate session
-    session = db.query(models.Session).filter(
-        models.Session.jti == jti,
-        models.Session.user_id == user.id
-    ).first()
+    # Validate the session and record activity in one statement; the row is
+    # only touched when the session is live, so no RETURNING row means the
+    # request is rejected and the follow-up SELECT only picks the message
+    now = datetime.utcnow()
+    session_id = db.execute(
+        update(models.Session).where(
+            models.Session.jti == jti,
+            models.Session.user_id == user.id,
+            models.Session.revoked_at.is_(None),
+            models.Session.expires_at >= now
+        ).values(last_activity=now).returning(models.Session.id)
+    ).scalar_one_or_none()
     
-    if session is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Session not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if session.revoked_at is not None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Session has been revoked",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if session.expires_at < datetime.utcnow():
+    if session_id is None:
+        session = db.query(models.Session).filter(
+            models.Session.jti == jti,
+            models.Session.user_id == user.id
+        ).first()
+        
+        if session is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        if session.revoked_at is not None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Update last activity
-    session.last_activity = datetime.utcnow()
-    db.commit()
+    # The user row was just read (or rebuilt from the cache); keep it loaded
+    # through the commit so handlers reading current_user do not SELECT it again
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = True
     
     return user
 
@@ -0,0 +1,135 @@
+"""
+In-process caching helpers.
+
+The backend runs as a single uvicorn process, so a small thread-safe TTL
+cache is enough for hot lookups whose results change rarely. Entries are
+invalidated explicitly by the endpoints that mutate the underlying rows and
+expire on their own after ``ttl`` seconds as a safety net.
+"""
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire ``ttl`` seconds after being set"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the oldest entry when full"""
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value (expired or not)"""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            return default if item is _MISSING else item[1]
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Remove every key for which predicate(key) is true"""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Role-specific profile completion status keyed by user id:
+# value is (role, has_role_specific_profile, profile_completed_at)
+profile_status_cache = TTLCache(maxsize=10_000, ttl=600)
+
+
+def invalidate_profile_status(user_id: Optional[int]) -> None:
+    """Drop the cached profile completion status for a user"""
+    if user_id is not None:
+        profile_status_cache.pop(user_id)
+
+
+# Column snapshots of authenticated users keyed by username, used by
+# get_current_user to skip the users SELECT on every request
+user_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def invalidate_user(username: Optional[str]) -> None:
+    """Drop the cached snapshot for a user"""
+    if username is not None:
+        user_cache.pop(username)
+
+
+# Verified JWT payloads keyed by the raw token string. Kept well under the
+# access token lifetime; expiry is re-checked on every hit by decode_token.
+decoded_token_cache = TTLCache(maxsize=4096, ttl=30)
+
+
+# Serialized GET /api/appointments/{id} bodies keyed by (appointment_id, user_id),
+# since the access check that guards the response depends on the caller
+appointment_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def invalidate_appointment(appointment_id: int) -> None:
+    """Drop every cached response for an appointment"""
+    appointment_cache.evict(lambda key: key[0] == appointment_id)
+
+
+# Serialized hospitalization list pages and records. Every role allowed to
+# read them sees the same data, so keys carry only the request parameters.
+# Any hospitalization write clears them all; the short TTL bounds how long
+# edited patient or doctor names can linger in cached bodies
+hospitalization_cache = TTLCache(maxsize=1024, ttl=15)
+
+
+def invalidate_hospitalizations() -> None:
+    """Drop every cached hospitalization response"""
+    hospitalization_cache.clear()
+
+
+# Total match counts of the patient and medical staff list endpoints keyed by
+# (list name, filters), so paging through one filtered listing counts once.
+# User writes through the ORM clear them (see auth.py); the TTL bounds drift
+# from writes that bypass the ORM
+list_count_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+def invalidate_list_counts() -> None:
+    """Drop every cached list count"""
+    list_count_cache.clear()
+
+
+# Serialized GET /api/medical-staff pages keyed by the request parameters. The
+# listing joins users to staff profiles and changes only on admin edits and
+# user writes, which clear it; the TTL bounds drift as for list counts
+medical_staff_list_cache = TTLCache(maxsize=256, ttl=30)
+
+
+def invalidate_medical_staff_list() -> None:
+    """Drop every cached medical staff list page"""
+    medical_staff_list_cache.clear()
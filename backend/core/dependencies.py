@@ -2,7 +2,12 @@ from fastapi import Depends, HTTPException, status
 from models import User, UserRole
 import auth
 
-def require_admin(current_user: User = Depends(auth.get_current_user)) -> User:
+# The role checks below only compare an attribute, so they are async: FastAPI
+# runs them on the event loop instead of handing each one to the threadpool.
+# FastAPI already evaluates a dependency once per request, however many
+# routes or sub-dependencies share it.
+
+async def require_admin(current_user: User = Depends(auth.get_current_user)) -> User:
     """Require admin role"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -11,7 +16,7 @@ def require_admin(current_user: User = Depends(auth.get_current_user)) -> User:
         )
     return current_user
 
-def require_doctor_or_admin(current_user: User = Depends(auth.get_current_user)) -> User:
+async def require_doctor_or_admin(current_user: User = Depends(auth.get_current_user)) -> User:
     """Require doctor or admin role"""
     if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR]:
         raise HTTPException(
@@ -20,7 +25,7 @@ def require_doctor_or_admin(current_user: User = Depends(auth.get_current_user))
         )
     return current_user
 
-def require_receptionist_or_admin(current_user: User = Depends(auth.get_current_user)) -> User:
+async def require_receptionist_or_admin(current_user: User = Depends(auth.get_current_user)) -> User:
     """Require receptionist or admin role"""
     if current_user.role not in [UserRole.ADMIN, UserRole.RECEPTIONIST]:
         raise HTTPException(
@@ -29,7 +34,7 @@ def require_receptionist_or_admin(current_user: User = Depends(auth.get_current_
         )
     return current_user
 
-def require_patient_access(current_user: User = Depends(auth.get_current_user)) -> User:
+async def require_patient_access(current_user: User = Depends(auth.get_current_user)) -> User:
     """Require doctor, receptionist, or admin role for patient access"""
     if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.RECEPTIONIST]:
         raise HTTPException(
@@ -38,7 +43,7 @@ def require_patient_access(current_user: User = Depends(auth.get_current_user))
         )
     return current_user
 
-def require_patient_role(current_user: User = Depends(auth.get_current_user)) -> User:
+async def require_patient_role(current_user: User = Depends(auth.get_current_user)) -> User:
     """Require patient role"""
     if current_user.role != UserRole.PATIENT:
         raise HTTPException(
@@ -48,7 +53,7 @@ def require_patient_role(current_user: User = Depends(auth.get_current_user)) ->
     return current_user
 
 
-def require_doctor_role(current_user: User = Depends(auth.get_current_user)) -> User:
+async def require_doctor_role(current_user: User = Depends(auth.get_current_user)) -> User:
     """Require doctor role"""
     if current_user.role != UserRole.DOCTOR:
         raise HTTPException(
@@ -0,0 +1,31 @@
+"""
+Keyset pagination cursors.
+
+List endpoints that order by ``(timestamp DESC, id DESC)`` hand out the sort
+key of the last row on a page as an opaque cursor; the next request seeks
+directly past that row instead of skipping ``OFFSET`` rows.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor, rejecting malformed input"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
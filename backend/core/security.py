@@ -1,6 +1,10 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 import bcrypt
+import hashlib
+import hmac
+import time
+from core.cache import decoded_token_cache
 from core.config import settings
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -12,7 +16,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -32,18 +36,44 @@ def create_access_token(data: dict, jti: str = None) -> str:
     return encoded_jwt, jti, expire
 
 def decode_token(token: str) -> dict:
-    """Decode and verify a JWT token"""
+    """
+    Decode and verify a JWT token.
+    
+    The same token arrives on every request of a session, so verified
+    payloads are memoized briefly; a cached payload is still rejected once
+    its exp claim has passed. Session revocation is checked against the
+    database by the callers, independently of this cache.
+    """
+    payload = decoded_token_cache.get(token)
+    if payload is not None:
+        exp = payload.get("exp")
+        if exp is None or exp > time.time():
+            return payload
+        decoded_token_cache.pop(token)
+        return None
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    decoded_token_cache.set(token, payload)
+    return payload
 
 def create_reset_token() -> str:
     """Create a secure random token for password reset"""
     import secrets
     return secrets.token_urlsafe(32)
 
+def hash_reset_token(token: str) -> str:
+    """
+    Hash a password reset token for storage and lookup.
+    
+    Only the keyed hash is stored, so a leaked users table does not yield
+    usable reset links; tokens are random, so one HMAC is enough.
+    """
+    return hmac.new(settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
 def create_reset_token_expiry() -> datetime:
     """Create expiry time for reset token (1 hour from now)"""
     return datetime.utcnow() + timedelta(hours=1)
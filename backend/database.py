@@ -1,18 +1,73 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/appdb")
 
-engine = create_engine(DATABASE_URL)
+# Sized for the threadpool that runs sync handlers: with the default of 5
+# connections, concurrent requests queue on the pool rather than the database.
+# The backend runs as a single uvicorn process, so the peak is
+# pool_size + max_overflow = 60 connections, which leaves headroom under
+# PostgreSQL's default max_connections of 100 for migrations and admin
+# sessions; with N workers keep N * (pool_size + max_overflow) below that.
+# A request that cannot get a connection within pool_timeout seconds fails
+# instead of hanging. Pre-ping and recycling keep connections dropped by
+# server idle timeouts from surfacing as request errors; LIFO reuses the most
+# recently returned connection so surplus ones stay idle and get recycled.
+if os.getenv("DB_EXTERNAL_POOL", "false").lower() == "true":
+    # An external pooler such as PgBouncer (transaction mode) already holds
+    # the server connections; pooling again here would pin them per process
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_pre_ping=True,
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_use_lifo=True
+    )
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+def forbid_lazy_loads(orm_execute_state):
+    """
+    Session event hook that raises on implicit relationship lazy loads.
+    
+    Lazy loads inside loops are where N+1 query patterns come from, so in
+    development and tests every relationship a handler touches must be
+    loaded up front (joinedload/selectinload) or queried explicitly.
+    """
+    if not orm_execute_state.is_select:
+        return
+    state = orm_execute_state.lazy_loaded_from
+    if state is not None:
+        raise InvalidRequestError(
+            f"Lazy load issued from {state.class_.__name__}; "
+            "add an eager loader option or query the relationship explicitly"
+        )
+
+
+# Opt-in for development: RAISE_ON_LAZY_LOAD=true makes lazy loads fail loudly
+if os.getenv("RAISE_ON_LAZY_LOAD", "false").lower() == "true":
+    event.listen(SessionLocal, "do_orm_execute", forbid_lazy_loads)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        # Handlers let unexpected errors propagate to the app-wide exception
+        # handlers; undo whatever the failed request left pending first
+        db.rollback()
+        raise
     finally:
         db.close()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Index, Enum, ForeignKey, Text, ForeignKey, JSON, Table, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index, Enum, ForeignKey, Text, ForeignKey, JSON, Table, Boolean
+from sqlalchemy import text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -11,7 +12,10 @@ hospitalization_doctors = Table(
     Base.metadata,
     Column('hospitalization_id', Integer, ForeignKey('hospitalizations.id', ondelete='CASCADE'), primary_key=True),
     Column('doctor_id', Integer, ForeignKey('doctors.id', ondelete='CASCADE'), primary_key=True),
-    Column('created_at', DateTime, server_default=func.now(), nullable=False)
+    Column('created_at', DateTime, server_default=func.now(), nullable=False),
+    # The primary key covers lookups by hospitalization; this one serves a
+    # doctor's hospitalizations (e.g. the "my patients" filter)
+    Index('ix_hospitalization_doctors_doctor_id', 'doctor_id')
 )
 
 class UserRole(str, enum.Enum):
@@ -53,7 +57,7 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime, nullable=True, default=None, index=True)
-    reset_token = Column(String, nullable=True, index=True)
+    reset_token = Column(String, nullable=True)
     reset_token_expires = Column(DateTime, nullable=True)
     
     # Email preferences (JSON field for granular control)
@@ -72,9 +76,38 @@ class User(Base):
 
     __table_args__ = (
         Index('ix_users_role_deleted', 'role', 'deleted_at'),
+        # Live users of a role in list order, so paginated role listings read
+        # rows in order from the index instead of sorting every match
+        Index(
+            'ix_users_role_created_live', 'role', created_at.desc(), id.desc(),
+            postgresql_where=text('deleted_at IS NULL')
+        ),
+        # Trigram index so the patient list's substring search on phone can
+        # avoid a seq scan; names and email use ix_users_search_trgm
+        Index('ix_users_phone_trgm', 'phone', postgresql_using='gin', postgresql_ops={'phone': 'gin_trgm_ops'}),
+        # Password reset looks up live users by token; only the few users with
+        # an outstanding token are indexed, and each token is unique
+        Index(
+            'ix_users_reset_token', 'reset_token', unique=True,
+            postgresql_where=text('reset_token IS NOT NULL AND deleted_at IS NULL'),
+            sqlite_where=text('reset_token IS NOT NULL AND deleted_at IS NULL')
+        ),
     )
 
 
+# Lowercased "first last email" text for substring search. The trigram GIN
+# index below is built on this exact expression, so ILIKE '%term%' filters
+# on it can use the index instead of scanning users
+user_search_text = func.lower(User.first_name + ' ' + User.last_name + ' ' + User.email)
+
+Index(
+    'ix_users_search_trgm',
+    user_search_text.label('search_text'),
+    postgresql_using='gin',
+    postgresql_ops={'search_text': 'gin_trgm_ops'}
+)
+
+
 class Patient(Base):
     __tablename__ = "patients"
 
@@ -89,6 +122,7 @@ class Patient(Base):
 
     # Relationships
     user = relationship("User", back_populates="patient")
+    hospitalizations = relationship("Hospitalization", back_populates="patient")
 
 
 class Doctor(Base):
@@ -105,10 +139,20 @@ class Doctor(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime, nullable=True, default=None, index=True)
     # Relationships
+    # user stays lazy: doctor rows are loaded on per-request role checks that
+    # never read it; response queries eager-load it explicitly
     user = relationship("User", back_populates="doctor")
+    hospitalizations = relationship("Hospitalization", secondary=hospitalization_doctors, back_populates="doctors")
 
     __table_args__ = (
         Index('ix_doctors_dept_spec_deleted', 'department', 'specialization', 'deleted_at'),
+        # At most one live doctor profile per user
+        Index(
+            'ux_doctors_user_id_live', 'user_id', unique=True,
+            postgresql_where=text('deleted_at IS NULL'), sqlite_where=text('deleted_at IS NULL')
+        ),
+        # Trigram index so substring search on doctor_id can avoid a seq scan
+        Index('ix_doctors_doctor_id_trgm', 'doctor_id', postgresql_using='gin', postgresql_ops={'doctor_id': 'gin_trgm_ops'}),
     )
 
 
@@ -142,14 +186,25 @@ class Hospitalization(Base):
     deleted_at = Column(DateTime, nullable=True, default=None, index=True)
 
     # Relationship to Patient
-    patient = relationship("Patient", backref="hospitalizations")
+    patient = relationship("Patient", back_populates="hospitalizations")
     
-    # Many-to-many relationship with doctors
-    doctors = relationship("Doctor", secondary=hospitalization_doctors, backref="hospitalizations")
+    # Many-to-many relationship with doctors; every hospitalization response
+    # lists them, so they load with one IN query per batch by default
+    doctors = relationship("Doctor", secondary=hospitalization_doctors, back_populates="hospitalizations", lazy="selectin")
 
     __table_args__ = (
         Index('ix_hospitalizations_patient_deleted', 'patient_id', 'deleted_at'),
         Index('ix_hospitalizations_admission_deleted', 'admission_date', 'deleted_at'),
+        # Live hospitalizations in list order, overall and per patient, so
+        # paginated lists read rows in order from the index instead of sorting
+        Index(
+            'ix_hospitalizations_admission_live', admission_date.desc(), id.desc(),
+            postgresql_where=text('deleted_at IS NULL')
+        ),
+        Index(
+            'ix_hospitalizations_patient_live', 'patient_id', admission_date.desc(), id.desc(),
+            postgresql_where=text('deleted_at IS NULL')
+        ),
     )
 
 
@@ -268,4 +323,18 @@ class BloodPressureReading(Base):
 
     __table_args__ = (
         Index('ix_bp_user_date', 'user_id', 'reading_date'),
+        # Partial index: only high-risk rows, for the high_risk_only filter
+        Index('ix_bp_high_risk', 'user_id', 'reading_date', postgresql_where=text('systolic > 120')),
     )
+
+
+class BloodPressureEmailSent(Base):
+    """
+    Marker row for a blood pressure alert email sent to a user on a given day.
+    The composite primary key lets the create endpoint claim the day's single
+    alert with one insert instead of counting the day's readings.
+    """
+    __tablename__ = "bp_email_sent"
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    sent_date = Column(Date, primary_key=True)
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
 from sqlalchemy import and_, or_, func
-from typing import Optional
-from datetime import datetime, timedelta, time
+from typing import Optional, Tuple
+from datetime import datetime, timedelta, time, date as date_type
+import calendar
 import secrets
 
 from database import get_db
@@ -14,12 +16,67 @@ from schemas import (
     DoctorAvailableSlotsResponse
 )
 import auth as auth_utils
+from core.cache import appointment_cache, invalidate_appointment, invalidate_profile_status
 from core.email import send_appointment_confirmation_email, send_email
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/appointments", tags=["appointments"])
+# Soft-delete predicates and the "slot is taken" statuses are built once and
+# reused by every query instead of being rebuilt per request
+ACTIVE_APPOINTMENT = Appointment.deleted_at.is_(None)
+ACTIVE_PATIENT = Patient.deleted_at.is_(None)
+ACTIVE_DOCTOR = Doctor.deleted_at.is_(None)
+ACTIVE_SHIFT = Shift.deleted_at.is_(None)
+OPEN_APPOINTMENT_STATUSES = (AppointmentStatus.PENDING.value, AppointmentStatus.CONFIRMED.value)
+
+# Patients and doctors are both backed by User rows, so responses join the
+# users table twice under these aliases
+PatientUser = aliased(User, name="patient_user")
+DoctorUser = aliased(User, name="doctor_user")
+ACTIVE_PATIENT_USER = PatientUser.deleted_at.is_(None)
+ACTIVE_DOCTOR_USER = DoctorUser.deleted_at.is_(None)
+
+# Every AppointmentResponse field, labelled with the schema field name
+APPOINTMENT_RESPONSE_COLUMNS = (
+    Appointment.id,
+    Appointment.patient_id,
+    Appointment.doctor_id,
+    Appointment.appointment_date,
+    Appointment.disease,
+    Appointment.status,
+    Appointment.created_at,
+    Appointment.updated_at,
+    Appointment.deleted_at,
+    PatientUser.first_name.label("patient_first_name"),
+    PatientUser.last_name.label("patient_last_name"),
+    PatientUser.age.label("patient_age"),
+    PatientUser.phone.label("patient_phone"),
+    DoctorUser.first_name.label("doctor_first_name"),
+    DoctorUser.last_name.label("doctor_last_name"),
+    Doctor.specialization.label("doctor_specialization"),
+    Doctor.department.label("doctor_department"),
+)
+
+# Extra columns needed to email the patient about an appointment
+PATIENT_CONTACT_COLUMNS = (
+    PatientUser.id.label("patient_user_id"),
+    PatientUser.email.label("patient_email"),
+    PatientUser.email_preferences.label("patient_email_preferences"),
+)
+
+# User ids behind the appointment's patient and doctor, so ownership checks
+# need no separate Patient/Doctor lookup for the caller
+OWNER_COLUMNS = (
+    Patient.user_id.label("owner_patient_user_id"),
+    Doctor.user_id.label("owner_doctor_user_id"),
+)
+
+router = APIRouter(
+    prefix="/api/appointments",
+    tags=["appointments"],
+    default_response_class=ORJSONResponse
+)
 
 
 def require_appointment_access(current_user: User = Depends(auth_utils.get_current_user)) -> User:
@@ -37,6 +94,88 @@ def require_appointment_management(current_user: User = Depends(auth_utils.get_c
     return current_user
 
 
+def appointment_response_query(db: Session, *extra_columns):
+    """
+    Query selecting every AppointmentResponse field in a single round-trip.
+    
+    Patient, doctor and their users are outer-joined with the soft-delete
+    filter in the join condition, so a deleted record yields NULL fields
+    rather than hiding the appointment. Rows map directly onto the schema:
+    AppointmentResponse(**row._mapping).
+    """
+    return db.query(*APPOINTMENT_RESPONSE_COLUMNS, *extra_columns).outerjoin(
+        Patient, and_(Patient.id == Appointment.patient_id, ACTIVE_PATIENT)
+    ).outerjoin(
+        PatientUser, and_(PatientUser.id == Patient.user_id, ACTIVE_PATIENT_USER)
+    ).outerjoin(
+        Doctor, and_(Doctor.id == Appointment.doctor_id, ACTIVE_DOCTOR)
+    ).outerjoin(
+        DoctorUser, and_(DoctorUser.id == Doctor.user_id, ACTIVE_DOCTOR_USER)
+    ).filter(ACTIVE_APPOINTMENT)
+
+
+def get_appointment_with_owners(db: Session, appointment_id: int):
+    """Load an active appointment and its patient's/doctor's user ids in one query"""
+    return db.query(Appointment, *OWNER_COLUMNS).outerjoin(
+        Patient, and_(Patient.id == Appointment.patient_id, ACTIVE_PATIENT)
+    ).outerjoin(
+        Doctor, and_(Doctor.id == Appointment.doctor_id, ACTIVE_DOCTOR)
+    ).filter(
+        Appointment.id == appointment_id,
+        ACTIVE_APPOINTMENT
+    ).first()
+
+
+def ensure_appointment_owner(current_user: User, row, detail: str) -> None:
+    """
+    Raise 403 unless the caller may act on the appointment in row.
+    
+    Patients must own the appointment and doctors must be assigned to it;
+    row carries the OWNER_COLUMNS labels.
+    """
+    if current_user.role in (UserRole.PATIENT, UserRole.UNDEFINED):
+        allowed = row.owner_patient_user_id == current_user.id
+    elif current_user.role == UserRole.DOCTOR:
+        allowed = row.owner_doctor_user_id == current_user.id
+    else:
+        allowed = True
+    
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
+
+
+def get_doctor_with_shift(db: Session, doctor_id: int, day: date_type) -> Tuple[Optional[Doctor], Optional[Shift]]:
+    """
+    Load an active doctor, its user and that user's shift on the given day.
+    
+    The user is joined onto the doctor row and the day's shifts are fetched
+    with one selectin IN query, so this costs two round-trips regardless of
+    what the caller touches afterwards. Returns (doctor, shift); either may
+    be None.
+    """
+    day_start, day_end = day_range(day)
+    doctor = db.query(Doctor).options(
+        joinedload(Doctor.user).selectinload(
+            User.shifts.and_(
+                Shift.date >= day_start,
+                Shift.date < day_end,
+                ACTIVE_SHIFT
+            )
+        )
+    ).filter(
+        Doctor.id == doctor_id,
+        ACTIVE_DOCTOR
+    ).first()
+    
+    if not doctor or not doctor.user or doctor.user.deleted_at is not None:
+        return doctor, None
+    
+    return doctor, next(iter(doctor.user.shifts), None)
+
+
 def generate_medical_record_number(user_id: int) -> str:
     """Generate unique medical record number."""
     timestamp = int(datetime.utcnow().timestamp())
@@ -44,6 +183,33 @@ def generate_medical_record_number(user_id: int) -> str:
     return f"MRN-{timestamp}-{user_id}-{random_suffix}"
 
 
+def day_range(day: date_type) -> Tuple[datetime, datetime]:
+    """
+    Return the [start, end) bounds of a calendar day.
+    
+    Filtering with `column >= start AND column < end` keeps the predicate
+    sargable so the (user_id, date) / (doctor_id, appointment_date) indexes
+    are used, unlike wrapping the column in func.date().
+    """
+    day_start = datetime.combine(day, time.min)
+    return day_start, day_start + timedelta(days=1)
+
+
+def epoch_seconds(value: datetime) -> int:
+    """Whole seconds since the Unix epoch, treating naive datetimes as UTC"""
+    return calendar.timegm(value.utctimetuple())
+
+
+def within_shift(shift: Shift, when: datetime) -> bool:
+    """
+    Check whether a datetime falls inside a shift.
+    
+    Compared as epoch integers so naive shift times and timezone-aware
+    request times (e.g. a trailing 'Z') can be mixed safely.
+    """
+    return epoch_seconds(shift.start_time) <= epoch_seconds(when) <= epoch_seconds(shift.end_time)
+
+
 def send_appointment_status_update_email(
     to_email: str,
     patient_name: str,
@@ -288,7 +454,7 @@ def get_or_create_patient(db: Session, user: User) -> Patient:
     patient = db.query(Patient).filter(
         and_(
             Patient.user_id == user.id,
-            Patient.deleted_at.is_(None)
+            ACTIVE_PATIENT
         )
     ).first()
     
@@ -307,6 +473,7 @@ def get_or_create_patient(db: Session, user: User) -> Patient:
         user.role = UserRole.PATIENT
     
     db.flush()
+    invalidate_profile_status(user.id)
     return patient
 
 
@@ -329,13 +496,11 @@ async def create_appointment(
         # Get or create patient profile for current user
         patient = get_or_create_patient(db, current_user)
         
-        # Verify doctor exists
-        doctor = db.query(Doctor).filter(
-            and_(
-                Doctor.id == appointment_data.doctor_id,
-                Doctor.deleted_at.is_(None)
-            )
-        ).first()
+        # Parse appointment date
+        appointment_date = datetime.fromisoformat(appointment_data.appointment_date.replace('Z', '+00:00'))
+        
+        # Verify doctor exists and load their shift on the requested date
+        doctor, shift = get_doctor_with_shift(db, appointment_data.doctor_id, appointment_date.date())
         
         if not doctor:
             raise HTTPException(
@@ -343,19 +508,6 @@ async def create_appointment(
                 detail="Doctor not found"
             )
         
-        # Parse appointment date
-        appointment_date = datetime.fromisoformat(appointment_data.appointment_date.replace('Z', '+00:00'))
-        
-        # Check if doctor has shift on requested date
-        doctor_user = db.query(User).filter(User.id == doctor.user_id).first()
-        shift = db.query(Shift).filter(
-            and_(
-                Shift.user_id == doctor_user.id,
-                func.date(Shift.date) == appointment_date.date(),
-                Shift.deleted_at.is_(None)
-            )
-        ).first()
-        
         if not shift:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -363,7 +515,7 @@ async def create_appointment(
             )
         
         # Check if appointment time is within shift hours
-        if not (shift.start_time <= appointment_date <= shift.end_time):
+        if not within_shift(shift, appointment_date):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Appointment time must be between {shift.start_time.strftime('%H:%M')} and {shift.end_time.strftime('%H:%M')}"
@@ -374,8 +526,8 @@ async def create_appointment(
             and_(
                 Appointment.doctor_id == appointment_data.doctor_id,
                 Appointment.appointment_date == appointment_date,
-                Appointment.deleted_at.is_(None),
-                Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED])
+                ACTIVE_APPOINTMENT,
+                Appointment.status.in_(OPEN_APPOINTMENT_STATUSES)
             )
         ).first()
         
@@ -395,54 +547,38 @@ async def create_appointment(
         )
         
         db.add(db_appointment)
+        db.flush()
+        appointment_id = db_appointment.id
         db.commit()
-        db.refresh(db_appointment)
+        
+        row = appointment_response_query(db, *PATIENT_CONTACT_COLUMNS).filter(
+            Appointment.id == appointment_id
+        ).first()
         
         # Send confirmation email
-        patient_user = db.query(User).filter(User.id == patient.user_id).first()
         try:
-            if patient_user and patient_user.email:
+            if row.patient_email:
                 # Check email preferences
-                email_prefs = patient_user.email_preferences or {}
+                email_prefs = row.patient_email_preferences or {}
                 if email_prefs.get("appointment_updates", True):
                     formatted_date = appointment_date.strftime("%B %d, %Y at %I:%M %p")
                     send_appointment_confirmation_email(
-                        to_email=patient_user.email,
-                        patient_name=f"{patient_user.first_name} {patient_user.last_name}",
-                        doctor_name=f"Dr. {doctor_user.first_name} {doctor_user.last_name}",
+                        to_email=row.patient_email,
+                        patient_name=f"{row.patient_first_name} {row.patient_last_name}",
+                        doctor_name=f"Dr. {row.doctor_first_name} {row.doctor_last_name}",
                         appointment_date=formatted_date,
-                        department=doctor.department or "General",
-                        disease=appointment_data.disease,
-                        user_id=patient_user.id
+                        department=row.doctor_department or "General",
+                        disease=row.disease,
+                        user_id=row.patient_user_id
                     )
-                    logger.info(f"Appointment confirmation email sent to {patient_user.email}")
+                    logger.info(f"Appointment confirmation email sent to {row.patient_email}")
                 else:
-                    logger.info(f"Appointment emails disabled for user {patient_user.email}")
+                    logger.info(f"Appointment emails disabled for user {row.patient_email}")
         except Exception as e:
             # Log error but don't fail the appointment creation
             logger.error(f"Failed to send appointment confirmation email: {str(e)}")
         
-        # Build response with patient and doctor info
-        
-        return {
-            "id": db_appointment.id,
-            "patient_id": db_appointment.patient_id,
-            "doctor_id": db_appointment.doctor_id,
-            "appointment_date": db_appointment.appointment_date,
-            "disease": db_appointment.disease,
-            "status": db_appointment.status,
-            "created_at": db_appointment.created_at,
-            "updated_at": db_appointment.updated_at,
-            "deleted_at": db_appointment.deleted_at,
-            "patient_first_name": patient_user.first_name if patient_user else None,
-            "patient_last_name": patient_user.last_name if patient_user else None,
-            "patient_age": patient_user.age if patient_user else None,
-            "patient_phone": patient_user.phone if patient_user else None,
-            "doctor_first_name": doctor_user.first_name if doctor_user else None,
-            "doctor_last_name": doctor_user.last_name if doctor_user else None,
-            "doctor_specialization": doctor.specialization,
-            "doctor_department": doctor.department,
-        }
+        return AppointmentResponse(**row._mapping)
         
     except HTTPException:
         raise
@@ -480,24 +616,8 @@ async def get_appointments(
     - Admins: See all appointments
     """
     try:
-        # Base query
-        query = db.query(
-            Appointment,
-            User.first_name.label('patient_first_name'),
-            User.last_name.label('patient_last_name'),
-            User.age.label('patient_age'),
-            User.phone.label('patient_phone')
-        ).join(
-            Patient, Appointment.patient_id == Patient.id
-        ).join(
-            User, Patient.user_id == User.id
-        ).filter(
-            and_(
-                Appointment.deleted_at.is_(None),
-                Patient.deleted_at.is_(None),
-                User.deleted_at.is_(None)
-            )
-        )
+        # Base query (only appointments whose patient and patient user are active)
+        query = appointment_response_query(db).filter(PatientUser.id.isnot(None))
         
         # Role-based filtering
         if current_user.role == UserRole.PATIENT or current_user.role == UserRole.UNDEFINED:
@@ -505,7 +625,7 @@ async def get_appointments(
             patient = db.query(Patient).filter(
                 and_(
                     Patient.user_id == current_user.id,
-                    Patient.deleted_at.is_(None)
+                    ACTIVE_PATIENT
                 )
             ).first()
             if patient:
@@ -525,7 +645,7 @@ async def get_appointments(
             doctor = db.query(Doctor).filter(
                 and_(
                     Doctor.user_id == current_user.id,
-                    Doctor.deleted_at.is_(None)
+                    ACTIVE_DOCTOR
                 )
             ).first()
             if doctor:
@@ -570,41 +690,7 @@ async def get_appointments(
         results = query.order_by(Appointment.appointment_date.desc()).offset(offset).limit(page_size).all()
         
         # Build response
-        appointments = []
-        for appointment, patient_first_name, patient_last_name, patient_age, patient_phone in results:
-            # Get doctor info (filter deleted doctors)
-            doctor = db.query(Doctor).filter(
-                and_(
-                    Doctor.id == appointment.doctor_id,
-                    Doctor.deleted_at.is_(None)
-                )
-            ).first()
-            doctor_user = db.query(User).filter(
-                and_(
-                    User.id == doctor.user_id,
-                    User.deleted_at.is_(None)
-                )
-            ).first() if doctor else None
-            
-            appointments.append({
-                "id": appointment.id,
-                "patient_id": appointment.patient_id,
-                "doctor_id": appointment.doctor_id,
-                "appointment_date": appointment.appointment_date,
-                "disease": appointment.disease,
-                "status": appointment.status,
-                "created_at": appointment.created_at,
-                "updated_at": appointment.updated_at,
-                "deleted_at": appointment.deleted_at,
-                "patient_first_name": patient_first_name,
-                "patient_last_name": patient_last_name,
-                "patient_age": patient_age,
-                "patient_phone": patient_phone,
-                "doctor_first_name": doctor_user.first_name if doctor_user else None,
-                "doctor_last_name": doctor_user.last_name if doctor_user else None,
-                "doctor_specialization": doctor.specialization if doctor else None,
-                "doctor_department": doctor.department if doctor else None,
-            })
+        appointments = [AppointmentResponse(**row._mapping) for row in results]
         
         return {
             "appointments": appointments,
@@ -634,6 +720,7 @@ async def get_available_doctors(
     """
     try:
         requested_date = datetime.fromisoformat(date).date()
+        day_start, day_end = day_range(requested_date)
         
         # Get all shifts for the requested date
         shifts = db.query(Shift, User, Doctor).join(
@@ -642,10 +729,11 @@ async def get_available_doctors(
             Doctor, Doctor.user_id == User.id
         ).filter(
             and_(
-                func.date(Shift.date) == requested_date,
-                Shift.deleted_at.is_(None),
+                Shift.date >= day_start,
+                Shift.date < day_end,
+                ACTIVE_SHIFT,
                 User.role == UserRole.DOCTOR,
-                Doctor.deleted_at.is_(None)
+                ACTIVE_DOCTOR
             )
         ).all()
         
@@ -655,9 +743,10 @@ async def get_available_doctors(
             appointment_count = db.query(Appointment).filter(
                 and_(
                     Appointment.doctor_id == doctor.id,
-                    func.date(Appointment.appointment_date) == requested_date,
-                    Appointment.deleted_at.is_(None),
-                    Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED])
+                    Appointment.appointment_date >= day_start,
+                    Appointment.appointment_date < day_end,
+                    ACTIVE_APPOINTMENT,
+                    Appointment.status.in_(OPEN_APPOINTMENT_STATUSES)
                 )
             ).count()
             
@@ -695,7 +784,7 @@ async def get_available_doctors(
 async def get_doctor_available_slots(
     doctor_id: int,
     date: str = Query(..., description="Date to check availability (YYYY-MM-DD)"),
-    slot_duration: int = Query(30, description="Slot duration in minutes"),
+    slot_duration: int = Query(30, ge=1, description="Slot duration in minutes"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_appointment_access)
 ):
@@ -704,13 +793,11 @@ async def get_doctor_available_slots(
     Returns list of available and booked slots based on doctor's shift.
     """
     try:
-        # Verify doctor exists
-        doctor = db.query(Doctor).filter(
-            and_(
-                Doctor.id == doctor_id,
-                Doctor.deleted_at.is_(None)
-            )
-        ).first()
+        requested_date = datetime.fromisoformat(date).date()
+        day_start, day_end = day_range(requested_date)
+        
+        # Verify doctor exists and get their shift for this date
+        doctor, shift = get_doctor_with_shift(db, doctor_id, requested_date)
         
         if not doctor:
             raise HTTPException(
@@ -718,18 +805,6 @@ async def get_doctor_available_slots(
                 detail="Doctor not found"
             )
         
-        requested_date = datetime.fromisoformat(date).date()
-        
-        # Get doctor's shift for this date
-        doctor_user = db.query(User).filter(User.id == doctor.user_id).first()
-        shift = db.query(Shift).filter(
-            and_(
-                Shift.user_id == doctor_user.id,
-                func.date(Shift.date) == requested_date,
-                Shift.deleted_at.is_(None)
-            )
-        ).first()
-        
         if not shift:
             return {
                 "doctor_id": doctor_id,
@@ -741,26 +816,27 @@ async def get_doctor_available_slots(
                 "booked_slots": []
             }
         
-        # Generate all possible slots
-        slots = []
-        current_time = shift.start_time
-        
-        while current_time < shift.end_time:
-            slots.append(current_time)
-            current_time = current_time + timedelta(minutes=slot_duration)
-        
         # Get existing appointments for this doctor on this date
         existing_appointments = db.query(Appointment).filter(
             and_(
                 Appointment.doctor_id == doctor_id,
-                func.date(Appointment.appointment_date) == requested_date,
-                Appointment.deleted_at.is_(None),
-                Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED])
+                Appointment.appointment_date >= day_start,
+                Appointment.appointment_date < day_end,
+                ACTIVE_APPOINTMENT,
+                Appointment.status.in_(OPEN_APPOINTMENT_STATUSES)
             )
         ).all()
         
         booked_times = {apt.appointment_date for apt in existing_appointments}
-        available_slots = [slot for slot in slots if slot not in booked_times]
+        booked_ts = {epoch_seconds(booked) for booked in booked_times}
+        
+        # Walk the shift in whole seconds and only build datetimes for free slots
+        start_ts = epoch_seconds(shift.start_time)
+        available_slots = [
+            shift.start_time + timedelta(seconds=ts - start_ts)
+            for ts in range(start_ts, epoch_seconds(shift.end_time), slot_duration * 60)
+            if ts not in booked_ts
+        ]
         
         return {
             "doctor_id": doctor_id,
@@ -800,12 +876,16 @@ async def get_appointment(
     - Doctors can only view their appointments
     - Admins can view any appointment
     """
+    # Repeat reads (polling, page refreshes) are served from the already
+    # serialized body; the write endpoints below invalidate it
+    cache_key = (appointment_id, current_user.id)
+    body = appointment_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
     try:
-        appointment = db.query(Appointment).filter(
-            and_(
-                Appointment.id == appointment_id,
-                Appointment.deleted_at.is_(None)
-            )
+        appointment = appointment_response_query(db, *OWNER_COLUMNS).filter(
+            Appointment.id == appointment_id
         ).first()
         
         if not appointment:
@@ -815,78 +895,12 @@ async def get_appointment(
             )
         
         # Check access permissions
-        if current_user.role == UserRole.PATIENT or current_user.role == UserRole.UNDEFINED:
-            patient = db.query(Patient).filter(
-                and_(
-                    Patient.user_id == current_user.id,
-                    Patient.deleted_at.is_(None)
-                )
-            ).first()
-            if not patient or appointment.patient_id != patient.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied"
-                )
+        ensure_appointment_owner(current_user, appointment, "Access denied")
         
-        elif current_user.role == UserRole.DOCTOR:
-            doctor = db.query(Doctor).filter(
-                and_(
-                    Doctor.user_id == current_user.id,
-                    Doctor.deleted_at.is_(None)
-                )
-            ).first()
-            if not doctor or appointment.doctor_id != doctor.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied"
-                )
-        
-        # Get patient and doctor info (filter deleted records)
-        patient = db.query(Patient).filter(
-            and_(
-                Patient.id == appointment.patient_id,
-                Patient.deleted_at.is_(None)
-            )
-        ).first()
-        patient_user = db.query(User).filter(
-            and_(
-                User.id == patient.user_id,
-                User.deleted_at.is_(None)
-            )
-        ).first() if patient else None
+        body = AppointmentResponse(**appointment._mapping).model_dump_json().encode()
+        appointment_cache.set(cache_key, body)
         
-        doctor = db.query(Doctor).filter(
-            and_(
-                Doctor.id == appointment.doctor_id,
-                Doctor.deleted_at.is_(None)
-            )
-        ).first()
-        doctor_user = db.query(User).filter(
-            and_(
-                User.id == doctor.user_id,
-                User.deleted_at.is_(None)
-            )
-        ).first() if doctor else None
-        
-        return {
-            "id": appointment.id,
-            "patient_id": appointment.patient_id,
-            "doctor_id": appointment.doctor_id,
-            "appointment_date": appointment.appointment_date,
-            "disease": appointment.disease,
-            "status": appointment.status,
-            "created_at": appointment.created_at,
-            "updated_at": appointment.updated_at,
-            "deleted_at": appointment.deleted_at,
-            "patient_first_name": patient_user.first_name if patient_user else None,
-            "patient_last_name": patient_user.last_name if patient_user else None,
-            "patient_age": patient_user.age if patient_user else None,
-            "patient_phone": patient_user.phone if patient_user else None,
-            "doctor_first_name": doctor_user.first_name if doctor_user else None,
-            "doctor_last_name": doctor_user.last_name if doctor_user else None,
-            "doctor_specialization": doctor.specialization if doctor else None,
-            "doctor_department": doctor.department if doctor else None,
-        }
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         raise
@@ -911,34 +925,19 @@ async def update_appointment(
     Requires: Doctor or Admin role
     """
     try:
-        appointment = db.query(Appointment).filter(
-            and_(
-                Appointment.id == appointment_id,
-                Appointment.deleted_at.is_(None)
-            )
-        ).first()
+        row = get_appointment_with_owners(db, appointment_id)
         
-        if not appointment:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Appointment not found"
             )
+        appointment = row.Appointment
         
         # Check if doctor can only update their own appointments
-        if current_user.role == UserRole.DOCTOR:
-            doctor = db.query(Doctor).filter(
-                and_(
-                    Doctor.user_id == current_user.id,
-                    Doctor.deleted_at.is_(None)
-                )
-            ).first()
-            if not doctor or appointment.doctor_id != doctor.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update your own appointments"
-                )
+        ensure_appointment_owner(current_user, row, "You can only update your own appointments")
         
-        # Update fields
+        # Update fields (updated_at is set by the database via onupdate=func.now())
         update_data = appointment_update.dict(exclude_unset=True)
         
         if update_data:
@@ -947,25 +946,7 @@ async def update_appointment(
                     new_date = datetime.fromisoformat(value.replace('Z', '+00:00'))
                     
                     # Check doctor has shift on new date
-                    doctor = db.query(Doctor).filter(
-                        and_(
-                            Doctor.id == appointment.doctor_id,
-                            Doctor.deleted_at.is_(None)
-                        )
-                    ).first()
-                    doctor_user = db.query(User).filter(
-                        and_(
-                            User.id == doctor.user_id,
-                            User.deleted_at.is_(None)
-                        )
-                    ).first() if doctor else None
-                    shift = db.query(Shift).filter(
-                        and_(
-                            Shift.user_id == doctor_user.id,
-                            func.date(Shift.date) == new_date.date(),
-                            Shift.deleted_at.is_(None)
-                        )
-                    ).first()
+                    doctor, shift = get_doctor_with_shift(db, appointment.doctor_id, new_date.date())
                     
                     if not shift:
                         raise HTTPException(
@@ -973,7 +954,7 @@ async def update_appointment(
                             detail="Doctor is not available on the new date"
                         )
                     
-                    if not (shift.start_time <= new_date <= shift.end_time):
+                    if not within_shift(shift, new_date):
                         raise HTTPException(
                             status_code=status.HTTP_400_BAD_REQUEST,
                             detail=f"Appointment time must be between {shift.start_time.strftime('%H:%M')} and {shift.end_time.strftime('%H:%M')}"
@@ -985,8 +966,8 @@ async def update_appointment(
                             Appointment.id != appointment_id,
                             Appointment.doctor_id == appointment.doctor_id,
                             Appointment.appointment_date == new_date,
-                            Appointment.deleted_at.is_(None),
-                            Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED])
+                            ACTIVE_APPOINTMENT,
+                            Appointment.status.in_(OPEN_APPOINTMENT_STATUSES)
                         )
                     ).first()
                     
@@ -1001,58 +982,14 @@ async def update_appointment(
                     setattr(appointment, field, value.value)
                 elif field not in ['appointment_date', 'status']:
                     setattr(appointment, field, value)
-            
-            appointment.updated_at = datetime.utcnow()
         
         db.commit()
-        db.refresh(appointment)
+        invalidate_appointment(appointment_id)
         
         # Build response
-        patient = db.query(Patient).filter(
-            and_(
-                Patient.id == appointment.patient_id,
-                Patient.deleted_at.is_(None)
-            )
-        ).first()
-        patient_user = db.query(User).filter(
-            and_(
-                User.id == patient.user_id,
-                User.deleted_at.is_(None)
-            )
-        ).first() if patient else None
+        row = appointment_response_query(db).filter(Appointment.id == appointment_id).first()
         
-        doctor = db.query(Doctor).filter(
-            and_(
-                Doctor.id == appointment.doctor_id,
-                Doctor.deleted_at.is_(None)
-            )
-        ).first()
-        doctor_user = db.query(User).filter(
-            and_(
-                User.id == doctor.user_id,
-                User.deleted_at.is_(None)
-            )
-        ).first() if doctor else None
-        
-        return {
-            "id": appointment.id,
-            "patient_id": appointment.patient_id,
-            "doctor_id": appointment.doctor_id,
-            "appointment_date": appointment.appointment_date,
-            "disease": appointment.disease,
-            "status": appointment.status,
-            "created_at": appointment.created_at,
-            "updated_at": appointment.updated_at,
-            "deleted_at": appointment.deleted_at,
-            "patient_first_name": patient_user.first_name if patient_user else None,
-            "patient_last_name": patient_user.last_name if patient_user else None,
-            "patient_age": patient_user.age if patient_user else None,
-            "patient_phone": patient_user.phone if patient_user else None,
-            "doctor_first_name": doctor_user.first_name if doctor_user else None,
-            "doctor_last_name": doctor_user.last_name if doctor_user else None,
-            "doctor_specialization": doctor.specialization if doctor else None,
-            "doctor_department": doctor.department if doctor else None,
-        }
+        return AppointmentResponse(**row._mapping)
         
     except HTTPException:
         raise
@@ -1074,6 +1011,7 @@ async def update_appointment(
 async def update_appointment_status(
     appointment_id: int,
     status_update: AppointmentStatusUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_appointment_management)
 ):
@@ -1083,110 +1021,70 @@ async def update_appointment_status(
     Requires: Doctor or Admin role
     """
     try:
-        appointment = db.query(Appointment).filter(
-            and_(
-                Appointment.id == appointment_id,
-                Appointment.deleted_at.is_(None)
-            )
-        ).first()
+        row = get_appointment_with_owners(db, appointment_id)
         
-        if not appointment:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Appointment not found"
             )
+        appointment = row.Appointment
         
         # Check if doctor can only update their own appointments
-        if current_user.role == UserRole.DOCTOR:
-            doctor = db.query(Doctor).filter(
-                and_(
-                    Doctor.user_id == current_user.id,
-                    Doctor.deleted_at.is_(None)
-                )
-            ).first()
-            if not doctor or appointment.doctor_id != doctor.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update your own appointments"
-                )
+        ensure_appointment_owner(current_user, row, "You can only update your own appointments")
         
         old_status = appointment.status
-        appointment.status = status_update.status.value
-        appointment.updated_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(appointment)
+        # Single UPDATE with the timestamp taken from the database clock
+        updated = db.query(Appointment).filter(
+            Appointment.id == appointment_id,
+            ACTIVE_APPOINTMENT
+        ).update(
+            {"status": status_update.status.value, "updated_at": func.now()},
+            synchronize_session=False
+        )
         
-        # Send status update email
-        patient = db.query(Patient).filter(
-            and_(
-                Patient.id == appointment.patient_id,
-                Patient.deleted_at.is_(None)
-            )
-        ).first()
-        patient_user = db.query(User).filter(
-            and_(
-                User.id == patient.user_id,
-                User.deleted_at.is_(None)
-            )
-        ).first() if patient else None
-        doctor = db.query(Doctor).filter(
-            and_(
-                Doctor.id == appointment.doctor_id,
-                Doctor.deleted_at.is_(None)
+        if updated == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Appointment not found"
             )
+        
+        db.commit()
+        invalidate_appointment(appointment_id)
+        
+        row = appointment_response_query(db, *PATIENT_CONTACT_COLUMNS).filter(
+            Appointment.id == appointment_id
         ).first()
-        doctor_user = db.query(User).filter(
-            and_(
-                User.id == doctor.user_id,
-                User.deleted_at.is_(None)
-            )
-        ).first() if doctor else None
         
+        # Send status update email
         try:
-            if patient_user and patient_user.email and old_status != status_update.status.value:
+            if row.patient_email and old_status != status_update.status.value:
                 # Check email preferences
-                email_prefs = patient_user.email_preferences or {}
+                email_prefs = row.patient_email_preferences or {}
                 if email_prefs.get("appointment_updates", True):
-                    formatted_date = appointment.appointment_date.strftime("%B %d, %Y at %I:%M %p")
-                    send_appointment_status_update_email(
-                        to_email=patient_user.email,
-                        patient_name=f"{patient_user.first_name} {patient_user.last_name}",
-                        doctor_name=f"Dr. {doctor_user.first_name} {doctor_user.last_name}" if doctor_user else "Doctor",
+                    formatted_date = row.appointment_date.strftime("%B %d, %Y at %I:%M %p")
+                    # Sent after the response is returned so SMTP latency
+                    # doesn't hold up the request
+                    background_tasks.add_task(
+                        send_appointment_status_update_email,
+                        to_email=row.patient_email,
+                        patient_name=f"{row.patient_first_name} {row.patient_last_name}",
+                        doctor_name=f"Dr. {row.doctor_first_name} {row.doctor_last_name}" if row.doctor_first_name else "Doctor",
                         appointment_date=formatted_date,
                         old_status=old_status,
                         new_status=status_update.status.value,
-                        disease=appointment.disease,
-                        user_id=patient_user.id
+                        disease=row.disease,
+                        user_id=row.patient_user_id
                     )
-                    logger.info(f"Status update email sent to {patient_user.email} for appointment {appointment_id}")
+                    logger.info(f"Status update email queued for {row.patient_email} for appointment {appointment_id}")
                 else:
-                    logger.info(f"Appointment update emails disabled for user {patient_user.email}")
+                    logger.info(f"Appointment update emails disabled for user {row.patient_email}")
         except Exception as e:
             # Log error but don't fail the status update
-            logger.error(f"Failed to send status update email: {str(e)}")
+            logger.error(f"Failed to queue status update email: {str(e)}")
         
-        # Build response (reuse already fetched doctor and patient data)
-        
-        return {
-            "id": appointment.id,
-            "patient_id": appointment.patient_id,
-            "doctor_id": appointment.doctor_id,
-            "appointment_date": appointment.appointment_date,
-            "disease": appointment.disease,
-            "status": appointment.status,
-            "created_at": appointment.created_at,
-            "updated_at": appointment.updated_at,
-            "deleted_at": appointment.deleted_at,
-            "patient_first_name": patient_user.first_name if patient_user else None,
-            "patient_last_name": patient_user.last_name if patient_user else None,
-            "patient_age": patient_user.age if patient_user else None,
-            "patient_phone": patient_user.phone if patient_user else None,
-            "doctor_first_name": doctor_user.first_name if doctor_user else None,
-            "doctor_last_name": doctor_user.last_name if doctor_user else None,
-            "doctor_specialization": doctor.specialization if doctor else None,
-            "doctor_department": doctor.department if doctor else None,
-        }
+        return AppointmentResponse(**row._mapping)
         
     except HTTPException:
         raise
@@ -1212,50 +1110,26 @@ async def delete_appointment(
     - Admins can cancel any appointment
     """
     try:
-        appointment = db.query(Appointment).filter(
-            and_(
-                Appointment.id == appointment_id,
-                Appointment.deleted_at.is_(None)
-            )
-        ).first()
+        row = get_appointment_with_owners(db, appointment_id)
         
-        if not appointment:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Appointment not found"
             )
         
         # Check access permissions
-        if current_user.role == UserRole.PATIENT or current_user.role == UserRole.UNDEFINED:
-            patient = db.query(Patient).filter(
-                and_(
-                    Patient.user_id == current_user.id,
-                    Patient.deleted_at.is_(None)
-                )
-            ).first()
-            if not patient or appointment.patient_id != patient.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only cancel your own appointments"
-                )
-        
-        elif current_user.role == UserRole.DOCTOR:
-            doctor = db.query(Doctor).filter(
-                and_(
-                    Doctor.user_id == current_user.id,
-                    Doctor.deleted_at.is_(None)
-                )
-            ).first()
-            if not doctor or appointment.doctor_id != doctor.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only cancel your own appointments"
-                )
+        ensure_appointment_owner(current_user, row, "You can only cancel your own appointments")
         
         # Soft delete
-        appointment.deleted_at = datetime.utcnow()
-        appointment.status = AppointmentStatus.CANCELLED.value
+        db.query(Appointment).filter(
+            Appointment.id == appointment_id
+        ).update(
+            {"deleted_at": func.now(), "status": AppointmentStatus.CANCELLED.value},
+            synchronize_session=False
+        )
         db.commit()
+        invalidate_appointment(appointment_id)
         
         return None
         
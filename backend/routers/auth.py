@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import and_, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime
 import auth as auth_utils
 import models
@@ -8,22 +9,18 @@ import schemas
 from database import get_db
 from core.security import create_access_token, create_refresh_token, decode_token, get_password_hash
 from core.password_policy import PasswordPolicy
+from core.cache import invalidate_list_counts, invalidate_medical_staff_list, profile_status_cache
 
 router = APIRouter(prefix="/api", tags=["authentication"])
 
+# Checked against when the username does not exist, so a failed login costs
+# one bcrypt verification either way and response time does not reveal
+# whether the account exists
+_DUMMY_HASH = get_password_hash("x" * 32)
+
 @router.post("/register", response_model=schemas.UserResponse)
 def register(user: schemas.UserRegister, db: Session = Depends(get_db)):
     """Register a new user"""
-    # Check if user exists
-    db_user = db.query(models.User).filter(
-        (models.User.email == user.email) | (models.User.username == user.username)
-    ).first()
-    if db_user:
-        raise HTTPException(
-            status_code=400, 
-            detail="Email or username already registered"
-        )
-    
     # Validate password against policy
     is_valid, errors = PasswordPolicy.validate(user.password, user.username)
     if not is_valid:
@@ -32,9 +29,11 @@ def register(user: schemas.UserRegister, db: Session = Depends(get_db)):
             detail={"message": "Password does not meet requirements", "errors": errors}
         )
     
-    # Create new user with provided role or default 'undefined'
+    # Create new user with provided role or default 'undefined'.
+    # The unique email/username indexes reject duplicates inside the INSERT
+    # itself, so there is no separate existence check to race against.
     hashed_password = auth_utils.get_password_hash(user.password)
-    new_user = models.User(
+    stmt = pg_insert(models.User).values(
         email=user.email,
         username=user.username,
         first_name=user.first_name,
@@ -46,11 +45,22 @@ def register(user: schemas.UserRegister, db: Session = Depends(get_db)):
         gender=user.gender.value if user.gender else None,  # Can be None
         hashed_password=hashed_password,
         role=user.role.value if user.role else "undefined"
-    )
-    db.add(new_user)
+    ).on_conflict_do_nothing().returning(models.User)
+    
+    new_user = db.scalars(stmt).first()
+    if new_user is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=400, 
+            detail="Email or username already registered"
+        )
+    
+    response = schemas.UserResponse.model_validate(new_user)
     db.commit()
-    db.refresh(new_user)
-    return new_user
+    # The Core INSERT skips the ORM hooks that normally clear user lists
+    invalidate_list_counts()
+    invalidate_medical_staff_list()
+    return response
 
 @router.post("/refresh", response_model=schemas.Token)
 def refresh_token(
@@ -87,32 +97,25 @@ def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Find user
-    db_user = db.query(models.User).filter(
+    # Find the live session for this refresh token together with its user
+    session = db.query(models.Session).join(
+        models.Session.user
+    ).options(
+        contains_eager(models.Session.user)
+    ).filter(
+        models.Session.refresh_jti == refresh_jti,
+        models.Session.revoked_at.is_(None),
         models.User.username == username,
         models.User.deleted_at.is_(None)
     ).first()
     
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Find session with this refresh token
-    session = db.query(models.Session).filter(
-        models.Session.refresh_jti == refresh_jti,
-        models.Session.user_id == db_user.id,
-        models.Session.revoked_at.is_(None)
-    ).first()
-    
     if not session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session not found or revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    db_user = session.user
     
     # Check if refresh token expired
     if session.refresh_expires_at < datetime.utcnow():
@@ -127,11 +130,17 @@ def refresh_token(
         data={"sub": db_user.username}
     )
     
-    # Update session with new access token JTI
-    session.jti = new_access_jti
-    session.expires_at = new_access_expires
-    session.last_activity = datetime.utcnow()
-    
+    # Update session with new access token JTI in a single UPDATE by primary
+    # key, without going through the unit-of-work flush
+    db.execute(
+        update(models.Session).where(
+            models.Session.id == session.id
+        ).values(
+            jti=new_access_jti,
+            expires_at=new_access_expires,
+            last_activity=datetime.utcnow()
+        )
+    )
     db.commit()
     
     return {
@@ -147,10 +156,10 @@ def login(user: schemas.UserLogin, request: Request, db: Session = Depends(get_d
         models.User.username == user.username
     ).first()
     
-    if not db_user or not auth_utils.verify_password(
-        user.password, 
-        db_user.hashed_password
-    ):
+    target_hash = db_user.hashed_password if db_user else _DUMMY_HASH
+    password_ok = auth_utils.verify_password(user.password, target_hash)
+    
+    if not db_user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -167,17 +176,19 @@ def login(user: schemas.UserLogin, request: Request, db: Session = Depends(get_d
     access_token, access_jti, access_expires = create_access_token(data={"sub": db_user.username})
     refresh_token, refresh_jti, refresh_expires = create_refresh_token(data={"sub": db_user.username})
     
-    # Create session record with both tokens
-    session = models.Session(
-        user_id=db_user.id,
-        jti=access_jti,
-        refresh_jti=refresh_jti,
-        ip_address=request.client.host if request.client else None,
-        user_agent=request.headers.get("user-agent"),
-        expires_at=access_expires,
-        refresh_expires_at=refresh_expires
+    # Create session record with both tokens. Nothing reads the new row
+    # back, so insert it directly instead of building an ORM object
+    db.execute(
+        insert(models.Session).values(
+            user_id=db_user.id,
+            jti=access_jti,
+            refresh_jti=refresh_jti,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            expires_at=access_expires,
+            refresh_expires_at=refresh_expires
+        )
     )
-    db.add(session)
     db.commit()
 
     return {
@@ -188,7 +199,7 @@ def login(user: schemas.UserLogin, request: Request, db: Session = Depends(get_d
 
 
 @router.post("/change-password")
-async def change_password(
+def change_password(
     password_change: schemas.PasswordChangeRequest,
     current_user: models.User = Depends(auth_utils.get_current_user),
     db: Session = Depends(get_db)
@@ -234,6 +245,19 @@ async def get_current_user_profile_status(
     profile_completed_at = None
     requires_profile_completion = current_user.role in [models.UserRole.PATIENT, models.UserRole.DOCTOR]
     
+    # Profiles are only created/deleted by a handful of endpoints which
+    # invalidate this entry, so the steady state never touches the database
+    cached = profile_status_cache.get(current_user.id)
+    if cached is not None and cached[0] == current_user.role:
+        _, has_role_specific_profile, profile_completed_at = cached
+        return schemas.ProfileCompletionStatus(
+            user_id=current_user.id,
+            role=current_user.role,
+            has_role_specific_profile=has_role_specific_profile,
+            profile_completed_at=profile_completed_at,
+            requires_profile_completion=requires_profile_completion
+        )
+    
     if current_user.role == models.UserRole.PATIENT:
         patient = db.query(models.Patient).filter(
             and_(
@@ -256,6 +280,11 @@ async def get_current_user_profile_status(
             has_role_specific_profile = True
             profile_completed_at = doctor.created_at
     
+    profile_status_cache.set(
+        current_user.id,
+        (current_user.role, has_role_specific_profile, profile_completed_at)
+    )
+    
     return schemas.ProfileCompletionStatus(
         user_id=current_user.id,
         role=current_user.role,
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, func, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+import html
 import math
 import logging
+from string import Template
 
-from database import get_db
-from models import BloodPressureReading, User, UserRole
+from database import SessionLocal, get_db
+from models import BloodPressureEmailSent, BloodPressureReading, User, UserRole, user_search_text
 from schemas import (
     BloodPressureCreate,
     BloodPressureResponse,
@@ -16,22 +19,252 @@ from schemas import (
 )
 import auth as auth_utils
 from core.email import send_email
+from core.pagination import decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/blood-pressure", tags=["blood-pressure"])
 
+# Roles that may see and manage every user's readings
+MEDICAL_STAFF_ROLES = frozenset({
+    UserRole.ADMIN,
+    UserRole.DOCTOR,
+    UserRole.MEDICAL_STAFF,
+    UserRole.RECEPTIONIST,
+})
 
-def send_blood_pressure_recommendation(user: User, systolic: int, reading_date: datetime) -> bool:
-    """Send personalized blood pressure recommendation email."""
+# Format of the reading date shown in the alert email
+DATE_FMT = "%B %d, %Y at %I:%M %p"
+
+# Per-condition wording of the blood pressure alert email
+_BP_ALERT_CONTENT = {
+    "high": {
+        "subject": "Important: High Blood Pressure Reading Detected",
+        "status_text": "HIGH",
+        "status_color": "#f44336",
+        "recommendation": """
+            <p><strong>Medical Recommendation:</strong></p>
+            <ul>
+                <li>Consult with your doctor before making any changes</li>
+                <li>Reduce salt intake in your diet</li>
+                <li>Engage in regular physical activity (30 minutes daily)</li>
+                <li>Maintain a healthy weight</li>
+                <li>Limit alcohol consumption</li>
+                <li>Manage stress through relaxation techniques</li>
+                <li>Avoid smoking and caffeine</li>
+            </ul>
+            """,
+        "advice": "High blood pressure can lead to serious health complications including heart disease and stroke. We strongly recommend scheduling an appointment with your doctor as soon as possible for a comprehensive evaluation.",
+    },
+    "low": {
+        "subject": "Important: Low Blood Pressure Reading Detected",
+        "status_text": "LOW",
+        "status_color": "#ff9800",
+        "recommendation": """
+            <p><strong>Medical Recommendation:</strong></p>
+            <ul>
+                <li>Increase salt intake moderately (consult your doctor first)</li>
+                <li>Drink more water to increase blood volume</li>
+                <li>Eat small, frequent meals</li>
+                <li>Avoid standing up quickly</li>
+                <li>Wear compression stockings</li>
+                <li>Avoid prolonged standing</li>
+            </ul>
+            """,
+        "advice": "Low blood pressure can cause dizziness, fainting, and in severe cases, shock. We recommend consulting with your doctor to determine the underlying cause and appropriate treatment.",
+    },
+}
+
+# Alert email pieces. The <head>/CSS and banner depend only on the alert
+# kind, so they are rendered once per kind at import; only the body and the
+# unsubscribe footer are filled per send
+_BP_EMAIL_HEADER = Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {
+            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
+            line-height: 1.6;
+            color: #1a1d23;
+            margin: 0;
+            padding: 0;
+            background-color: #f2f4f8;
+        }
+        .container {
+            max-width: 600px;
+            margin: 40px auto;
+            background: white;
+            border-radius: 12px;
+            overflow: hidden;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        }
+        .header {
+            background: $status_color;
+            color: white;
+            padding: 40px 30px;
+            text-align: center;
+        }
+        .header h1 {
+            margin: 0;
+            font-size: 28px;
+            font-weight: 700;
+        }
+        .content {
+            padding: 40px 30px;
+            background: white;
+        }
+        .alert-box {
+            background: #fff3e0;
+            border-left: 4px solid $status_color;
+            padding: 20px;
+            margin: 24px 0;
+            border-radius: 4px;
+        }
+        .reading-box {
+            background: #f2f4f8;
+            padding: 24px;
+            border-radius: 8px;
+            margin: 24px 0;
+            text-align: center;
+        }
+        .reading-value {
+            font-size: 48px;
+            font-weight: 700;
+            color: $status_color;
+            margin: 10px 0;
+        }
+        .recommendation {
+            background: #e3f2fd;
+            padding: 20px;
+            border-radius: 8px;
+            margin: 24px 0;
+        }
+        .recommendation ul {
+            margin: 10px 0;
+            padding-left: 20px;
+        }
+        .recommendation li {
+            margin: 8px 0;
+        }
+        .cta-button {
+            display: inline-block;
+            background: #16a249;
+            color: white;
+            padding: 14px 32px;
+            text-decoration: none;
+            border-radius: 6px;
+            font-weight: 600;
+            margin: 20px 0;
+        }
+        .footer {
+            text-align: center;
+            padding: 24px 30px;
+            background: #f2f4f8;
+            color: #6c757d;
+            font-size: 13px;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <div style="font-size: 20px; font-weight: 700; margin-bottom: 8px;">🏥 Hospital Management System</div>
+            <h1>$status_text Blood Pressure Alert</h1>
+        </div>
+""")
+
+_BP_EMAIL_HEADERS = {
+    kind: _BP_EMAIL_HEADER.substitute(
+        status_color=alert["status_color"],
+        status_text=alert["status_text"]
+    )
+    for kind, alert in _BP_ALERT_CONTENT.items()
+}
+
+_BP_EMAIL_BODY = Template("""        <div class="content">
+            <p>Dear <strong>$patient_name</strong>,</p>
+            
+            <p>We have detected a blood pressure reading outside the normal range in your recent measurement.</p>
+            
+            <div class="reading-box">
+                <div style="font-size: 14px; color: #6c757d; text-transform: uppercase; letter-spacing: 1px;">Your Reading</div>
+                <div class="reading-value">$systolic mmHg</div>
+                <div style="font-size: 14px; color: #6c757d;">Systolic Pressure</div>
+                <div style="margin-top: 10px; font-size: 12px; color: #6c757d;">
+                    Recorded on $reading_date
+                </div>
+            </div>
+            
+            <div class="alert-box">
+                <strong>⚠️ Important Notice:</strong> Your blood pressure reading is $status_word and requires attention.
+            </div>
+            
+            <div class="recommendation">
+                $recommendation
+            </div>
+            
+            <div style="background: #fff3cd; border-left: 4px solid #ff9800; padding: 16px; margin: 24px 0; border-radius: 4px;">
+                <strong>⚕️ Medical Advice:</strong>
+                <p style="margin: 8px 0 0 0;">$advice</p>
+            </div>
+            
+            <div style="text-align: center; margin: 32px 0;">
+                <p style="font-size: 16px; font-weight: 600; margin-bottom: 16px;">
+                    Please schedule an appointment with your doctor
+                </p>
+            </div>
+            
+            <p style="margin-top: 32px; font-size: 14px; color: #6c757d;">
+                This is an automated health alert based on your blood pressure reading. If you have any immediate concerns or symptoms, please seek medical attention right away.
+            </p>
+            
+            <p style="margin-top: 32px;">
+                Best regards,<br>
+                <strong>Hospital Management System Team</strong>
+            </p>
+        </div>
+""")
+
+_BP_EMAIL_FOOTER = Template("""        <div class="footer">
+            <p>This is an automated email. Please do not reply to this message.</p>
+            <p style="margin-top: 12px;">
+                Don't want to receive blood pressure alerts? 
+                <a href="$unsubscribe_url" style="color: #16a249; text-decoration: underline;">Unsubscribe from blood pressure alerts</a>
+            </p>
+            <p>&copy; 2024 Hospital Management System. All rights reserved.</p>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+
+def send_blood_pressure_recommendation(
+    user_id: int,
+    email: Optional[str],
+    first_name: str,
+    last_name: str,
+    email_preferences: Optional[dict],
+    systolic: int,
+    reading_date: datetime
+) -> bool:
+    """
+    Send personalized blood pressure recommendation email.
+    
+    Takes plain values rather than a User so it can run as a background task
+    after the request's database session has been closed.
+    """
     try:
-        if not user.email:
+        if not email:
             return False
         
         # Check email preferences
-        email_prefs = user.email_preferences or {}
+        email_prefs = email_preferences or {}
         if not email_prefs.get("blood_pressure_alerts", True):
-            logger.info(f"Blood pressure alerts disabled for user {user.email}")
+            logger.info(f"Blood pressure alerts disabled for user {email}")
             return False
         
         # Determine if high or low
@@ -41,206 +274,34 @@ def send_blood_pressure_recommendation(user: User, systolic: int, reading_date:
         if not (is_high or is_low):
             return False  # Normal reading, no email needed
         
-        # Check if we already sent an email today for this condition
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
         # Prepare email content
-        patient_name = f"{user.first_name} {user.last_name}"
+        patient_name = f"{first_name} {last_name}"
+        formatted_date = reading_date.strftime(DATE_FMT)
         
         # Generate unsubscribe token and link
-        unsubscribe_token = auth_utils.create_unsubscribe_token(user.id)
+        unsubscribe_token = auth_utils.create_unsubscribe_token(user_id)
         # Get frontend URL from environment or use default
         import os
         frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
         unsubscribe_url = f"{frontend_url}/unsubscribe?token={unsubscribe_token}&preference=blood_pressure"
         
-        if is_high:
-            subject = "Important: High Blood Pressure Reading Detected"
-            status_text = "HIGH"
-            status_color = "#f44336"
-            recommendation = """
-            <p><strong>Medical Recommendation:</strong></p>
-            <ul>
-                <li>Consult with your doctor before making any changes</li>
-                <li>Reduce salt intake in your diet</li>
-                <li>Engage in regular physical activity (30 minutes daily)</li>
-                <li>Maintain a healthy weight</li>
-                <li>Limit alcohol consumption</li>
-                <li>Manage stress through relaxation techniques</li>
-                <li>Avoid smoking and caffeine</li>
-            </ul>
-            """
-            advice = "High blood pressure can lead to serious health complications including heart disease and stroke. We strongly recommend scheduling an appointment with your doctor as soon as possible for a comprehensive evaluation."
-        else:  # is_low
-            subject = "Important: Low Blood Pressure Reading Detected"
-            status_text = "LOW"
-            status_color = "#ff9800"
-            recommendation = """
-            <p><strong>Medical Recommendation:</strong></p>
-            <ul>
-                <li>Increase salt intake moderately (consult your doctor first)</li>
-                <li>Drink more water to increase blood volume</li>
-                <li>Eat small, frequent meals</li>
-                <li>Avoid standing up quickly</li>
-                <li>Wear compression stockings</li>
-                <li>Avoid prolonged standing</li>
-            </ul>
-            """
-            advice = "Low blood pressure can cause dizziness, fainting, and in severe cases, shock. We recommend consulting with your doctor to determine the underlying cause and appropriate treatment."
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                body {{
-                    font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #1a1d23;
-                    margin: 0;
-                    padding: 0;
-                    background-color: #f2f4f8;
-                }}
-                .container {{
-                    max-width: 600px;
-                    margin: 40px auto;
-                    background: white;
-                    border-radius: 12px;
-                    overflow: hidden;
-                    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                }}
-                .header {{
-                    background: {status_color};
-                    color: white;
-                    padding: 40px 30px;
-                    text-align: center;
-                }}
-                .header h1 {{
-                    margin: 0;
-                    font-size: 28px;
-                    font-weight: 700;
-                }}
-                .content {{
-                    padding: 40px 30px;
-                    background: white;
-                }}
-                .alert-box {{
-                    background: #fff3e0;
-                    border-left: 4px solid {status_color};
-                    padding: 20px;
-                    margin: 24px 0;
-                    border-radius: 4px;
-                }}
-                .reading-box {{
-                    background: #f2f4f8;
-                    padding: 24px;
-                    border-radius: 8px;
-                    margin: 24px 0;
-                    text-align: center;
-                }}
-                .reading-value {{
-                    font-size: 48px;
-                    font-weight: 700;
-                    color: {status_color};
-                    margin: 10px 0;
-                }}
-                .recommendation {{
-                    background: #e3f2fd;
-                    padding: 20px;
-                    border-radius: 8px;
-                    margin: 24px 0;
-                }}
-                .recommendation ul {{
-                    margin: 10px 0;
-                    padding-left: 20px;
-                }}
-                .recommendation li {{
-                    margin: 8px 0;
-                }}
-                .cta-button {{
-                    display: inline-block;
-                    background: #16a249;
-                    color: white;
-                    padding: 14px 32px;
-                    text-decoration: none;
-                    border-radius: 6px;
-                    font-weight: 600;
-                    margin: 20px 0;
-                }}
-                .footer {{
-                    text-align: center;
-                    padding: 24px 30px;
-                    background: #f2f4f8;
-                    color: #6c757d;
-                    font-size: 13px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <div style="font-size: 20px; font-weight: 700; margin-bottom: 8px;">🏥 Hospital Management System</div>
-                    <h1>{status_text} Blood Pressure Alert</h1>
-                </div>
-                <div class="content">
-                    <p>Dear <strong>{patient_name}</strong>,</p>
-                    
-                    <p>We have detected a blood pressure reading outside the normal range in your recent measurement.</p>
-                    
-                    <div class="reading-box">
-                        <div style="font-size: 14px; color: #6c757d; text-transform: uppercase; letter-spacing: 1px;">Your Reading</div>
-                        <div class="reading-value">{systolic} mmHg</div>
-                        <div style="font-size: 14px; color: #6c757d;">Systolic Pressure</div>
-                        <div style="margin-top: 10px; font-size: 12px; color: #6c757d;">
-                            Recorded on {reading_date.strftime("%B %d, %Y at %I:%M %p")}
-                        </div>
-                    </div>
-                    
-                    <div class="alert-box">
-                        <strong>⚠️ Important Notice:</strong> Your blood pressure reading is {status_text.lower()} and requires attention.
-                    </div>
-                    
-                    <div class="recommendation">
-                        {recommendation}
-                    </div>
-                    
-                    <div style="background: #fff3cd; border-left: 4px solid #ff9800; padding: 16px; margin: 24px 0; border-radius: 4px;">
-                        <strong>⚕️ Medical Advice:</strong>
-                        <p style="margin: 8px 0 0 0;">{advice}</p>
-                    </div>
-                    
-                    <div style="text-align: center; margin: 32px 0;">
-                        <p style="font-size: 16px; font-weight: 600; margin-bottom: 16px;">
-                            Please schedule an appointment with your doctor
-                        </p>
-                    </div>
-                    
-                    <p style="margin-top: 32px; font-size: 14px; color: #6c757d;">
-                        This is an automated health alert based on your blood pressure reading. If you have any immediate concerns or symptoms, please seek medical attention right away.
-                    </p>
-                    
-                    <p style="margin-top: 32px;">
-                        Best regards,<br>
-                        <strong>Hospital Management System Team</strong>
-                    </p>
-                </div>
-                <div class="footer">
-                    <p>This is an automated email. Please do not reply to this message.</p>
-                    <p style="margin-top: 12px;">
-                        Don't want to receive blood pressure alerts? 
-                        <a href="{unsubscribe_url}" style="color: #16a249; text-decoration: underline;">Unsubscribe from blood pressure alerts</a>
-                    </p>
-                    <p>&copy; 2024 Hospital Management System. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        kind = "high" if is_high else "low"
+        alert = _BP_ALERT_CONTENT[kind]
+        subject = alert["subject"]
+        
+        html_content = _BP_EMAIL_HEADERS[kind] + _BP_EMAIL_BODY.substitute(
+            status_word=alert["status_text"].lower(),
+            patient_name=html.escape(patient_name),
+            systolic=systolic,
+            reading_date=formatted_date,
+            recommendation=alert["recommendation"],
+            advice=alert["advice"]
+        ) + _BP_EMAIL_FOOTER.substitute(
+            unsubscribe_url=html.escape(unsubscribe_url)
+        )
         
         return send_email(
-            to_email=user.email,
+            to_email=email,
             subject=subject,
             html_content=html_content
         )
@@ -250,6 +311,32 @@ def send_blood_pressure_recommendation(user: User, systolic: int, reading_date:
         return False
 
 
+def send_blood_pressure_alert(sent_date: date, **email_args) -> None:
+    """
+    Send the day's claimed blood pressure alert as a background task.
+    
+    If no email went out, today's bp_email_sent claim is released so a later
+    abnormal reading the same day can try again.
+    """
+    if send_blood_pressure_recommendation(**email_args):
+        return
+    
+    db = SessionLocal()
+    try:
+        db.execute(
+            delete(BloodPressureEmailSent).where(
+                BloodPressureEmailSent.user_id == email_args["user_id"],
+                BloodPressureEmailSent.sent_date == sent_date
+            )
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to release blood pressure alert claim: {str(e)}")
+    finally:
+        db.close()
+
+
 def require_blood_pressure_access(current_user: User = Depends(auth_utils.get_current_user)) -> User:
     """Require authenticated user for blood pressure access."""
     return current_user
@@ -257,7 +344,7 @@ def require_blood_pressure_access(current_user: User = Depends(auth_utils.get_cu
 
 def require_medical_staff(current_user: User = Depends(auth_utils.get_current_user)) -> User:
     """Require medical staff, doctor, receptionist, or admin role."""
-    if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.MEDICAL_STAFF, UserRole.RECEPTIONIST]:
+    if current_user.role not in MEDICAL_STAFF_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied. Requires medical staff privileges."
@@ -266,8 +353,9 @@ def require_medical_staff(current_user: User = Depends(auth_utils.get_current_us
 
 
 @router.post("", response_model=BloodPressureResponse, status_code=status.HTTP_201_CREATED)
-async def create_blood_pressure_reading(
+def create_blood_pressure_reading(
     reading_data: BloodPressureCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_blood_pressure_access)
 ):
@@ -291,43 +379,43 @@ async def create_blood_pressure_reading(
         )
         
         db.add(db_reading)
+        
+        # Only the first abnormal reading of the day triggers an email. The
+        # (user_id, sent_date) primary key of bp_email_sent makes this insert
+        # a no-op once today's alert has been claimed, so no count is needed.
+        # Users who cannot receive the alert never claim the day.
+        send_alert = False
+        sent_date = datetime.utcnow().date()
+        alerts_enabled = bool(current_user.email) and (current_user.email_preferences or {}).get(
+            "blood_pressure_alerts", True
+        )
+        if alerts_enabled and (reading_data.systolic > 120 or reading_data.systolic < 90):
+            claimed = db.execute(
+                pg_insert(BloodPressureEmailSent).values(
+                    user_id=current_user.id,
+                    sent_date=sent_date
+                ).on_conflict_do_nothing()
+            )
+            send_alert = claimed.rowcount == 1
+        
         db.commit()
         db.refresh(db_reading)
         
-        # Send recommendation email if reading is abnormal (once per day)
-        try:
-            logger.info(f"Checking if email should be sent for systolic={reading_data.systolic}, user={current_user.email}")
-            
-            # Check if reading is abnormal
-            is_abnormal = reading_data.systolic > 120 or reading_data.systolic < 90
-            
-            if is_abnormal:
-                # Check if we already sent an email today for this user
-                today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-                today_readings = db.query(BloodPressureReading).filter(
-                    and_(
-                        BloodPressureReading.user_id == current_user.id,
-                        BloodPressureReading.created_at >= today_start
-                    )
-                ).count()
-                
-                logger.info(f"Today's readings count: {today_readings}, is_abnormal: {is_abnormal}")
-                
-                # Only send email for the first abnormal reading of the day
-                if today_readings == 1:  # This is the first reading today
-                    logger.info(f"Attempting to send email to {current_user.email}")
-                    email_sent = send_blood_pressure_recommendation(current_user, reading_data.systolic, reading_date)
-                    if email_sent:
-                        logger.info(f"✅ Blood pressure recommendation email sent successfully to {current_user.email}")
-                    else:
-                        logger.warning(f"⚠️ Email sending returned False for {current_user.email}")
-                else:
-                    logger.info(f"Skipping email - already sent {today_readings} reading(s) today")
-            else:
-                logger.info(f"Reading is normal ({reading_data.systolic}), no email needed")
-        except Exception as e:
-            # Don't fail the request if email fails
-            logger.error(f"❌ Failed to send recommendation email: {str(e)}", exc_info=True)
+        if send_alert:
+            # Sent after the response is returned so SMTP latency
+            # doesn't hold up the request; a failed send releases the claim
+            background_tasks.add_task(
+                send_blood_pressure_alert,
+                sent_date=sent_date,
+                user_id=current_user.id,
+                email=current_user.email,
+                first_name=current_user.first_name,
+                last_name=current_user.last_name,
+                email_preferences=current_user.email_preferences,
+                systolic=reading_data.systolic,
+                reading_date=reading_date
+            )
+            logger.info(f"Blood pressure recommendation email queued for {current_user.email}")
         
         # Build response with user info
         return {
@@ -352,13 +440,14 @@ async def create_blood_pressure_reading(
 
 
 @router.get("", response_model=PaginatedBloodPressureResponse)
-async def get_blood_pressure_readings(
+def get_blood_pressure_readings(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of records per page"),
     search: Optional[str] = Query(None, description="Search by user name or email"),
-    date_from: Optional[str] = Query(None, description="Filter readings from this date (YYYY-MM-DD)"),
-    date_to: Optional[str] = Query(None, description="Filter readings until this date (YYYY-MM-DD)"),
+    date_from: Optional[date] = Query(None, description="Filter readings from this date (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, description="Filter readings until this date (YYYY-MM-DD)"),
     high_risk_only: bool = Query(False, description="Show only high-risk readings (systolic > 120)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_blood_pressure_access)
 ):
@@ -367,11 +456,24 @@ async def get_blood_pressure_readings(
     
     - Regular users: See only their own readings
     - Medical staff/doctors/receptionists/admins: See all readings with filters
+    
+    Pages can be requested by number or, for deep scrolling, by passing the
+    previous response's next_cursor; cursor requests seek straight to the
+    position instead of skipping rows, and do not compute total counts.
     """
+    if cursor is not None:
+        cursor_date, cursor_id = decode_cursor(cursor)
+    
     try:
-        # Base query with user join (filter deleted users)
+        # Base query with user join (filter deleted users). Only the columns
+        # the response uses are selected, so no ORM objects are built per row
         query = db.query(
-            BloodPressureReading,
+            BloodPressureReading.id,
+            BloodPressureReading.user_id,
+            BloodPressureReading.systolic,
+            BloodPressureReading.diastolic,
+            BloodPressureReading.reading_date,
+            BloodPressureReading.created_at,
             User.first_name,
             User.last_name,
             User.email
@@ -382,67 +484,86 @@ async def get_blood_pressure_readings(
         )
         
         # Role-based filtering
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.MEDICAL_STAFF, UserRole.RECEPTIONIST]:
+        if current_user.role not in MEDICAL_STAFF_ROLES:
             # Regular users see only their own readings
             query = query.filter(BloodPressureReading.user_id == current_user.id)
         
         # Apply search filter (medical staff only)
-        if search and current_user.role in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.MEDICAL_STAFF, UserRole.RECEPTIONIST]:
+        if search and current_user.role in MEDICAL_STAFF_ROLES:
             search_term = f"%{search.strip()}%"
-            query = query.filter(
-                or_(
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term),
-                    User.email.ilike(search_term)
-                )
-            )
+            query = query.filter(user_search_text.ilike(search_term))
         
-        # Apply date filters
+        # Apply date filters (already parsed to dates by FastAPI; date_to is
+        # inclusive of the whole day)
         if date_from:
-            date_from_dt = datetime.fromisoformat(date_from)
-            query = query.filter(BloodPressureReading.reading_date >= date_from_dt)
+            query = query.filter(BloodPressureReading.reading_date >= datetime.combine(date_from, time.min))
         
         if date_to:
-            date_to_dt = datetime.fromisoformat(date_to)
-            date_to_end = date_to_dt + timedelta(days=1)
-            query = query.filter(BloodPressureReading.reading_date < date_to_end)
+            query = query.filter(BloodPressureReading.reading_date < datetime.combine(date_to + timedelta(days=1), time.min))
         
         # Apply high-risk filter
         if high_risk_only:
             query = query.filter(BloodPressureReading.systolic > 120)
         
-        # Get total count
-        total = query.count()
-        
-        # Calculate pagination
-        total_pages = math.ceil(total / page_size)
-        offset = (page - 1) * page_size
-        
-        # Get paginated results
-        results = query.order_by(BloodPressureReading.reading_date.desc()).offset(offset).limit(page_size).all()
-        
-        # Build response
-        readings = []
-        for reading, first_name, last_name, email in results:
-            readings.append({
-                "id": reading.id,
-                "user_id": reading.user_id,
-                "systolic": reading.systolic,
-                "diastolic": reading.diastolic,
-                "reading_date": reading.reading_date,
-                "is_high_risk": reading.systolic > 120,
-                "created_at": reading.created_at,
-                "user_first_name": first_name,
-                "user_last_name": last_name,
-                "user_email": email,
-            })
+        order = (BloodPressureReading.reading_date.desc(), BloodPressureReading.id.desc())
+        
+        if cursor is not None:
+            # Keyset pagination: continue after the last row already seen
+            results = query.filter(
+                tuple_(BloodPressureReading.reading_date, BloodPressureReading.id)
+                < tuple_(cursor_date, cursor_id)
+            ).order_by(*order).limit(page_size).all()
+            total = None
+            total_pages = None
+        else:
+            offset = (page - 1) * page_size
+            
+            # Get paginated results, with the total match count computed by a
+            # window function in the same statement instead of a separate COUNT
+            results = query.add_columns(
+                func.count().over().label("total")
+            ).order_by(*order).offset(offset).limit(page_size).all()
+            
+            if results:
+                total = results[0].total
+            elif page > 1:
+                # Past the last page there are no rows to carry the total
+                total = query.count()
+            else:
+                total = 0
+            
+            # Calculate pagination
+            total_pages = math.ceil(total / page_size)
+        
+        next_cursor = None
+        if len(results) == page_size:
+            next_cursor = encode_cursor(results[-1].reading_date, results[-1].id)
+        
+        # Build response. Rows come straight from the database and are
+        # already well-typed, so skip per-field validation on construction
+        readings = [
+            BloodPressureResponse.model_construct(
+                id=row.id,
+                user_id=row.user_id,
+                systolic=row.systolic,
+                diastolic=row.diastolic,
+                reading_date=row.reading_date,
+                is_high_risk=row.systolic > 120,
+                created_at=row.created_at,
+                user_first_name=row.first_name,
+                user_last_name=row.last_name,
+                user_email=row.email,
+            )
+            for row in results
+        ]
         
         return {
             "readings": readings,
             "total": total,
             "page": page,
             "page_size": page_size,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
         }
         
     except Exception as e:
@@ -453,7 +574,7 @@ async def get_blood_pressure_readings(
 
 
 @router.get("/statistics", response_model=BloodPressureStatistics)
-async def get_blood_pressure_statistics(
+def get_blood_pressure_statistics(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_blood_pressure_access)
 ):
@@ -464,36 +585,23 @@ async def get_blood_pressure_statistics(
     - Medical staff: See statistics for all users
     """
     try:
-        # Base query
-        query = db.query(BloodPressureReading)
+        # Every statistic in a single aggregate query (AVG already skips NULL
+        # diastolic values)
+        query = db.query(
+            func.count(),
+            func.count().filter(BloodPressureReading.systolic > 120),
+            func.avg(BloodPressureReading.systolic),
+            func.avg(BloodPressureReading.diastolic),
+            func.max(BloodPressureReading.reading_date)
+        ).select_from(BloodPressureReading)
         
         # Role-based filtering
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.MEDICAL_STAFF, UserRole.RECEPTIONIST]:
+        if current_user.role not in MEDICAL_STAFF_ROLES:
             query = query.filter(BloodPressureReading.user_id == current_user.id)
         
-        # Get statistics
-        total_readings = query.count()
-        high_risk_count = query.filter(BloodPressureReading.systolic > 120).count()
+        total_readings, high_risk_count, avg_systolic, avg_diastolic, latest_reading_date = query.one()
         normal_count = total_readings - high_risk_count
         
-        # Calculate averages
-        avg_systolic_query = db.query(func.avg(BloodPressureReading.systolic))
-        avg_diastolic_query = db.query(func.avg(BloodPressureReading.diastolic)).filter(
-            BloodPressureReading.diastolic.isnot(None)
-        )
-        
-        # Apply user filter if not medical staff
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.MEDICAL_STAFF, UserRole.RECEPTIONIST]:
-            avg_systolic_query = avg_systolic_query.filter(BloodPressureReading.user_id == current_user.id)
-            avg_diastolic_query = avg_diastolic_query.filter(BloodPressureReading.user_id == current_user.id)
-        
-        avg_systolic = avg_systolic_query.scalar()
-        avg_diastolic = avg_diastolic_query.scalar()
-        
-        # Get latest reading date
-        latest_reading = query.order_by(BloodPressureReading.reading_date.desc()).first()
-        latest_reading_date = latest_reading.reading_date if latest_reading else None
-        
         return {
             "total_readings": total_readings,
             "high_risk_count": high_risk_count,
@@ -511,7 +619,7 @@ async def get_blood_pressure_statistics(
 
 
 @router.delete("/{reading_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_blood_pressure_reading(
+def delete_blood_pressure_reading(
     reading_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_blood_pressure_access)
@@ -523,9 +631,22 @@ async def delete_blood_pressure_reading(
     - Medical staff can delete any reading
     """
     try:
-        reading = db.query(BloodPressureReading).filter(
-            BloodPressureReading.id == reading_id
-        ).first()
+        # Medical staff can delete any reading, so there is nothing to check
+        # before the DELETE and the row never needs to be loaded
+        if current_user.role in MEDICAL_STAFF_ROLES:
+            result = db.execute(
+                delete(BloodPressureReading).where(BloodPressureReading.id == reading_id)
+            )
+            if result.rowcount == 0:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Blood pressure reading not found"
+                )
+            db.commit()
+            return None
+        
+        reading = db.get(BloodPressureReading, reading_id)
         
         if not reading:
             raise HTTPException(
@@ -534,12 +655,11 @@ async def delete_blood_pressure_reading(
             )
         
         # Check access permissions
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.MEDICAL_STAFF, UserRole.RECEPTIONIST]:
-            if reading.user_id != current_user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only delete your own readings"
-                )
+        if reading.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete your own readings"
+            )
         
         # Hard delete
         db.delete(reading)
@@ -1,16 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, contains_eager, raiseload
+from sqlalchemy import or_, and_, bindparam, func, lambda_stmt, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import datetime
 
 from database import get_db
-from models import Doctor, User, UserRole
+from models import Doctor, User, UserRole, user_search_text
 from schemas import DoctorProfileCreate, DoctorUpdate, DoctorResponse, PaginatedDoctorsResponse, DoctorProfileStatus
 from core.dependencies import require_admin, require_doctor_or_admin, require_doctor_role
 import auth as auth_utils
+from core.cache import invalidate_profile_status, invalidate_user
+from core.pagination import decode_cursor, encode_cursor
 
-router = APIRouter(prefix="/api/doctors", tags=["doctors"])
+router = APIRouter(
+    prefix="/api/doctors",
+    tags=["doctors"],
+    default_response_class=ORJSONResponse
+)
+
+# Columns of the doctor list, labelled as DoctorResponse fields. Profile
+# columns are NULL for doctors who have not completed their profile
+DOCTOR_LIST_COLUMNS = (
+    Doctor.id.label("id"),
+    Doctor.doctor_id,
+    Doctor.qualifications,
+    Doctor.department,
+    Doctor.specialization,
+    Doctor.license_number,
+    User.id.label("user_id"),
+    User.email,
+    User.username,
+    User.first_name,
+    User.last_name,
+    User.phone,
+    User.city,
+    User.age,
+    User.address,
+    User.gender,
+    User.role,
+    Doctor.created_at.label("profile_completed_at"),
+    User.created_at.label("created_at"),
+    User.updated_at.label("updated_at"),
+    User.deleted_at.label("deleted_at"),
+)
+
+# Single doctor lookup: User with a LEFT JOIN to Doctor, which contains_eager
+# uses to fill User.doctor instead of joinedload adding a second join. Built
+# once as a lambda statement so requests skip constructing and compiling it
+GET_DOCTOR_STMT = lambda_stmt(
+    lambda: select(User)
+    .outerjoin(User.doctor)
+    .options(contains_eager(User.doctor), raiseload('*'))
+    .where(User.id == bindparam("user_id"), User.role == UserRole.DOCTOR)
+    .limit(1)
+)
+
+# Just the columns a single doctor's ETag and visibility depend on, so a
+# conditional request can be answered without loading the rows
+GET_DOCTOR_VERSION_STMT = lambda_stmt(
+    lambda: select(User.updated_at, User.deleted_at, Doctor.updated_at.label("doctor_updated_at"))
+    .outerjoin(User.doctor)
+    .where(User.id == bindparam("user_id"), User.role == UserRole.DOCTOR)
+    .limit(1)
+)
+
+# DoctorUpdate fields stored on the users and doctors tables respectively
+DOCTOR_USER_FIELDS = frozenset({'email', 'first_name', 'last_name', 'phone', 'city', 'age', 'address', 'gender'})
+DOCTOR_PROFILE_FIELDS = frozenset({'doctor_id', 'qualifications', 'department', 'specialization', 'license_number'})
+
+# 409 messages for the unique indexes that can reject a doctor write
+DOCTOR_CONFLICT_DETAILS = {
+    "ux_doctors_user_id_live": "Doctor profile already exists for this user",
+    "ix_doctors_doctor_id": "A doctor with this doctor ID already exists",
+    "ix_doctors_license_number": "A doctor with this license number already exists",
+    "ix_users_email": "A user with this email already exists",
+}
+
+
+def doctor_conflict_detail(exc: IntegrityError) -> str:
+    """Map a unique violation on doctors to a user-facing message"""
+    # psycopg2 reports the violated index name; other drivers do not
+    diag = getattr(exc.orig, "diag", None)
+    constraint_name = getattr(diag, "constraint_name", None)
+    return DOCTOR_CONFLICT_DETAILS.get(
+        constraint_name, "Doctor profile conflicts with an existing record"
+    )
+
+
+def doctor_etag(user_id: int, user_updated_at: Optional[datetime], doctor_updated_at: Optional[datetime]) -> str:
+    """
+    Weak ETag for a single doctor response.
+    
+    Every write to the user or the doctor profile, soft deletes included,
+    bumps the row's updated_at, so the two timestamps identify the version.
+    """
+    user_version = user_updated_at.isoformat() if user_updated_at else ""
+    doctor_version = doctor_updated_at.isoformat() if doctor_updated_at else ""
+    return f'W/"{user_id}-{user_version}-{doctor_version}"'
 
 
 def create_doctor_response(user: User, doctor: Doctor = None) -> DoctorResponse:
@@ -49,7 +137,7 @@ def create_doctor_response(user: User, doctor: Doctor = None) -> DoctorResponse:
 
 
 @router.post("/profile", response_model=DoctorResponse, status_code=status.HTTP_201_CREATED)
-async def complete_doctor_profile(
+def complete_doctor_profile(
     doctor_profile: DoctorProfileCreate,
     user_id: Optional[int] = None,
     db: Session = Depends(get_db),
@@ -64,326 +152,273 @@ async def complete_doctor_profile(
     
     Requires: Doctor role (for own profile) or Admin role (for any user)
     """
-    try:
-        # Determine target user
-        if user_id is not None:
-            # Admin completing profile for another user
-            if current_user.role != UserRole.ADMIN:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Only admin can complete profiles for other users"
-                )
-            
-            target_user = db.query(User).filter(
-                and_(User.id == user_id, User.deleted_at.is_(None))
-            ).first()
-            
-            if not target_user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Target user not found"
-                )
-            
-            if target_user.role != UserRole.DOCTOR:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Target user must have doctor role"
-                )
-        else:
-            # User completing their own profile
-            if current_user.role != UserRole.DOCTOR:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Only users with doctor role can complete their own doctor profile"
-                )
-            target_user = current_user
-        
-        # Check if user already has a doctor profile
-        existing_doctor = db.query(Doctor).filter(
-            and_(
-                Doctor.user_id == target_user.id,
-                Doctor.deleted_at.is_(None)
+    # Determine target user
+    if user_id is not None:
+        # Admin completing profile for another user
+        if current_user.role != UserRole.ADMIN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admin can complete profiles for other users"
             )
+        
+        target_user = db.query(User).filter(
+            and_(User.id == user_id, User.deleted_at.is_(None))
         ).first()
         
-        if existing_doctor:
+        if not target_user:
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Doctor profile already exists for this user"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Target user not found"
             )
         
-        # Check if doctor_id already exists (excluding soft-deleted records)
-        existing_doctor_id = db.query(Doctor).join(User, Doctor.user_id == User.id).filter(
-            and_(
-                Doctor.doctor_id == doctor_profile.doctor_id,
-                Doctor.deleted_at.is_(None),
-                User.deleted_at.is_(None)
+        if target_user.role != UserRole.DOCTOR:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Target user must have doctor role"
             )
-        ).first()
-        
-        if existing_doctor_id:
+    else:
+        # User completing their own profile
+        if current_user.role != UserRole.DOCTOR:
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="A doctor with this doctor ID already exists"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only users with doctor role can complete their own doctor profile"
             )
-        
-        # Create doctor record
-        db_doctor = Doctor(
-            user_id=target_user.id,
-            doctor_id=doctor_profile.doctor_id,
-            qualifications=doctor_profile.qualifications,
-            department=doctor_profile.department,
-            specialization=doctor_profile.specialization,
-            license_number=doctor_profile.license_number
-        )
-        db.add(db_doctor)
-        db.commit()
-        db.refresh(db_doctor)
-        
-        # Return combined response
-        return create_doctor_response(target_user, db_doctor)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+        target_user = current_user
+    
+    # Create doctor record
+    db_doctor = Doctor(
+        user_id=target_user.id,
+        doctor_id=doctor_profile.doctor_id,
+        qualifications=doctor_profile.qualifications,
+        department=doctor_profile.department,
+        specialization=doctor_profile.specialization,
+        license_number=doctor_profile.license_number
+    )
+    db.add(db_doctor)
+    
+    # One live profile per user and unique doctor/license IDs are enforced
+    # by unique indexes, so the INSERT itself detects conflicts, including
+    # ones from concurrent requests
+    try:
+        db.flush()
+    except IntegrityError as e:
         db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to complete doctor profile"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=doctor_conflict_detail(e)
         )
+    
+    # Build the response from the flushed state before commit expires it,
+    # so nothing has to be re-read afterwards
+    response = create_doctor_response(target_user, db_doctor)
+    db.commit()
+    invalidate_profile_status(response.user_id)
+    
+    return response
 
 
 @router.get("/profile/status", response_model=DoctorProfileStatus)
-async def get_doctor_profile_status(
+def get_doctor_profile_status(
     user_id: Optional[int] = None,
     current_user: User = Depends(auth_utils.get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get doctor profile completion status for current user or specified user"""
-    try:
-        # Determine target user
-        if user_id is not None:
-            # Admin checking status for another user
-            if current_user.role != UserRole.ADMIN:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Only admin can check profile status for other users"
-                )
-            
-            target_user = db.query(User).filter(
-                and_(User.id == user_id, User.deleted_at.is_(None))
-            ).first()
-            
-            if not target_user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Target user not found"
-                )
-            
-            target_user_id = target_user.id
-        else:
-            # User checking their own status
-            if current_user.role != UserRole.DOCTOR:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Only users with doctor role can check their own doctor profile status"
-                )
-            target_user_id = current_user.id
-        
-        doctor = db.query(Doctor).filter(
-            and_(
-                Doctor.user_id == target_user_id,
-                Doctor.deleted_at.is_(None)
+    # Determine target user
+    if user_id is not None:
+        # Admin checking status for another user
+        if current_user.role != UserRole.ADMIN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admin can check profile status for other users"
             )
+        
+        target_user = db.query(User).filter(
+            and_(User.id == user_id, User.deleted_at.is_(None))
         ).first()
         
-        return DoctorProfileStatus(
-            user_id=target_user_id,
-            has_doctor_profile=doctor is not None,
-            profile_completed_at=doctor.created_at if doctor else None
-        )
+        if not target_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Target user not found"
+            )
         
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve doctor profile status"
+        target_user_id = target_user.id
+    else:
+        # User checking their own status
+        if current_user.role != UserRole.DOCTOR:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only users with doctor role can check their own doctor profile status"
+            )
+        target_user_id = current_user.id
+    
+    doctor = db.query(Doctor).filter(
+        and_(
+            Doctor.user_id == target_user_id,
+            Doctor.deleted_at.is_(None)
         )
+    ).first()
+    
+    return DoctorProfileStatus(
+        user_id=target_user_id,
+        has_doctor_profile=doctor is not None,
+        profile_completed_at=doctor.created_at if doctor else None
+    )
 
 
 @router.get("/", response_model=PaginatedDoctorsResponse)
-async def get_doctors(
+def get_doctors(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of records per page"),
     search: Optional[str] = Query(None, description="Search by first name, last name, email, or doctor ID"),
     include_deleted: bool = Query(False, description="Include soft-deleted records (Admin only)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_doctor_or_admin)
 ):
     """
     Get list of all users with doctor role, regardless of profile completion status.
     
+    Pages can be requested by number or by passing the previous response's
+    next_cursor; cursor requests seek straight to the position instead of
+    skipping rows, and do not compute total counts.
+    
     Requires: Doctor or Admin role
     """
-    try:
-        # Query User table with LEFT JOIN to Doctor table to show all doctor users
-        query = db.query(User).outerjoin(Doctor, User.id == Doctor.user_id).filter(
-            User.role == UserRole.DOCTOR
-        )
-        
-        # Filter out soft-deleted records unless specifically requested by admin
-        if not include_deleted or current_user.role != UserRole.ADMIN:
-            query = query.filter(User.deleted_at.is_(None))
-        
-        # Apply search filter if provided
-        if search:
-            search_term = f"%{search.strip()}%"
-            query = query.filter(
-                or_(
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term),
-                    User.email.ilike(search_term),
-                    Doctor.doctor_id.ilike(search_term)
-                )
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+    
+    # Query User columns with a LEFT JOIN to the live Doctor profile to show
+    # all doctor users; rows are plain tuples, no ORM objects are built
+    query = db.query(*DOCTOR_LIST_COLUMNS).outerjoin(
+        Doctor, and_(User.id == Doctor.user_id, Doctor.deleted_at.is_(None))
+    ).filter(
+        User.role == UserRole.DOCTOR
+    )
+    
+    # Filter out soft-deleted records unless specifically requested by admin
+    if not include_deleted or current_user.role != UserRole.ADMIN:
+        query = query.filter(User.deleted_at.is_(None))
+    
+    # Apply search filter if provided
+    if search:
+        search_term = f"%{search.strip()}%"
+        # Both expressions are backed by trigram GIN indexes
+        query = query.filter(
+            or_(
+                user_search_text.ilike(search_term),
+                Doctor.doctor_id.ilike(search_term)
             )
+        )
+    
+    order = (User.created_at.desc(), User.id.desc())
+    
+    if cursor is not None:
+        # Keyset pagination: continue after the last row already seen
+        results = query.filter(
+            tuple_(User.created_at, User.id) < tuple_(cursor_created_at, cursor_id)
+        ).order_by(*order).limit(page_size).all()
+        total = None
+        total_pages = None
+    else:
+        offset = (page - 1) * page_size
         
-        # Get total count
-        total = query.count()
+        # Get paginated rows, with the total match count computed by a
+        # window function in the same statement
+        results = query.add_columns(
+            func.count().over().label("total")
+        ).order_by(*order).offset(offset).limit(page_size).all()
+        
+        if results:
+            total = results[0].total
+        elif page > 1:
+            # Past the last page there are no rows to carry the total
+            total = query.count()
+        else:
+            total = 0
         
         # Calculate pagination
         total_pages = (total + page_size - 1) // page_size
-        offset = (page - 1) * page_size
-        
-        # Get paginated users with optional doctor data
-        users_data = query.options(joinedload(User.doctor)).order_by(User.created_at.desc()).offset(offset).limit(page_size).all()
-        
-        # Convert to response format
-        doctors = []
-        for user in users_data:
-            doctor = user.doctor
-            profile_completed = doctor is not None and doctor.deleted_at is None
-            
-            doctors.append(DoctorResponse(
-                # Profile fields (null if profile incomplete)
-                id=doctor.id if profile_completed else None,
-                doctor_id=doctor.doctor_id if profile_completed else None,
-                qualifications=doctor.qualifications if profile_completed else None,
-                department=doctor.department if profile_completed else None,
-                specialization=doctor.specialization if profile_completed else None,
-                license_number=doctor.license_number if profile_completed else None,
-                
-                # User fields (always present)
-                user_id=user.id,
-                email=user.email,
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                phone=user.phone,
-                city=user.city,
-                age=user.age,
-                address=user.address,
-                gender=user.gender,
-                role=user.role,
-                
-                # Status fields
-                profile_completed=profile_completed,
-                profile_completed_at=doctor.created_at if profile_completed else None,
-                created_at=user.created_at,
-                updated_at=user.updated_at,
-                deleted_at=user.deleted_at
-            ))
-        
-        return {
-            "doctors": doctors,
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": total_pages
-        }
-        
-    except Exception as e:
+    
+    next_cursor = None
+    if len(results) == page_size and results[-1].created_at is not None:
+        next_cursor = encode_cursor(results[-1].created_at, results[-1].user_id)
+    
+    # Column labels match DoctorResponse fields and the values come straight
+    # from the database, so the page is serialized directly rather than
+    # validated through the response model
+    doctors = []
+    for row in results:
+        fields = row._asdict()
+        fields.pop("total", None)
+        fields["profile_completed"] = fields["id"] is not None
+        doctors.append(fields)
+    
+    return ORJSONResponse({
+        "doctors": doctors,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor
+    })
+
+
+def check_doctor_visible(user, current_user: User) -> None:
+    """Raise 404 unless the doctor user exists and the caller may see it"""
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor user not found"
+        )
+    
+    # Check if user is soft-deleted (only admin can see deleted records)
+    if user.deleted_at and current_user.role != UserRole.ADMIN:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve doctor records"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor user not found"
         )
 
 
 @router.get("/{user_id}", response_model=DoctorResponse)
-async def get_doctor(
+def get_doctor(
     user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_doctor_or_admin)
 ):
     """
     Get a specific doctor by user ID, regardless of profile completion status.
     
+    Responses carry a weak ETag; a request whose If-None-Match still matches
+    gets an empty 304 after a timestamp-only query.
+    
     Requires: Doctor or Admin role
     """
-    try:
-        # Query User table with LEFT JOIN to Doctor table
-        user = db.query(User).outerjoin(Doctor, User.id == Doctor.user_id).options(joinedload(User.doctor)).filter(
-            and_(
-                User.id == user_id,
-                User.role == UserRole.DOCTOR
-            )
-        ).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Doctor user not found"
-            )
-        
-        # Check if user is soft-deleted (only admin can see deleted records)
-        if user.deleted_at and current_user.role != UserRole.ADMIN:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Doctor user not found"
-            )
-        
-        doctor = user.doctor
-        profile_completed = doctor is not None and doctor.deleted_at is None
-        
-        return DoctorResponse(
-            # Profile fields (null if profile incomplete)
-            id=doctor.id if profile_completed else None,
-            doctor_id=doctor.doctor_id if profile_completed else None,
-            qualifications=doctor.qualifications if profile_completed else None,
-            department=doctor.department if profile_completed else None,
-            specialization=doctor.specialization if profile_completed else None,
-            license_number=doctor.license_number if profile_completed else None,
-            
-            # User fields (always present)
-            user_id=user.id,
-            email=user.email,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            phone=user.phone,
-            city=user.city,
-            age=user.age,
-            address=user.address,
-            gender=user.gender,
-            role=user.role,
-            
-            # Status fields
-            profile_completed=profile_completed,
-            profile_completed_at=doctor.created_at if profile_completed else None,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            deleted_at=user.deleted_at
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve doctor record"
-        )
+    if if_none_match:
+        version = db.execute(GET_DOCTOR_VERSION_STMT, {"user_id": user_id}).first()
+        check_doctor_visible(version, current_user)
+        etag = doctor_etag(user_id, version.updated_at, version.doctor_updated_at)
+        if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    user = db.execute(GET_DOCTOR_STMT, {"user_id": user_id}).scalars().first()
+    check_doctor_visible(user, current_user)
+    
+    # Always revalidate: the ETag saves the body, not the access check
+    response.headers["ETag"] = doctor_etag(
+        user.id, user.updated_at, user.doctor.updated_at if user.doctor else None
+    )
+    response.headers["Cache-Control"] = "private, no-cache"
+    
+    return create_doctor_response(user, user.doctor)
+
 
 
 @router.put("/{doctor_id}", response_model=DoctorResponse)
-async def update_doctor(
+def update_doctor(
     doctor_id: int,
     doctor_update: DoctorUpdate,
     db: Session = Depends(get_db),
@@ -394,86 +429,56 @@ async def update_doctor(
     
     Requires: Admin role only
     """
+    # Get existing doctor with user data
+    db_doctor = db.query(Doctor).join(Doctor.user).options(contains_eager(Doctor.user)).filter(
+        and_(Doctor.id == doctor_id, Doctor.deleted_at.is_(None), User.deleted_at.is_(None))
+    ).first()
+    
+    if not db_doctor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    
+    changes = doctor_update.model_dump(exclude_unset=True)
+    
+    # Update user fields
+    user_update_data = {k: v for k, v in changes.items() if k in DOCTOR_USER_FIELDS}
+    
+    if user_update_data:
+        for field, value in user_update_data.items():
+            setattr(db_doctor.user, field, value)
+        db_doctor.user.updated_at = datetime.utcnow()
+    
+    # Update doctor-specific fields
+    doctor_update_data = {k: v for k, v in changes.items() if k in DOCTOR_PROFILE_FIELDS}
+    
+    if doctor_update_data:
+        for field, value in doctor_update_data.items():
+            setattr(db_doctor, field, value)
+        db_doctor.updated_at = datetime.utcnow()
+    
+    # doctor_id, license number and email are unique-indexed, so the
+    # UPDATEs themselves detect conflicts without a check-then-write race
     try:
-        # Get existing doctor with user data
-        db_doctor = db.query(Doctor).join(User, Doctor.user_id == User.id).options(joinedload(Doctor.user)).filter(
-            and_(Doctor.id == doctor_id, Doctor.deleted_at.is_(None), User.deleted_at.is_(None))
-        ).first()
-        
-        if not db_doctor:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Doctor not found"
-            )
-        
-        # Check for doctor_id conflicts if doctor_id is being updated
-        if doctor_update.doctor_id and doctor_update.doctor_id != db_doctor.doctor_id:
-            existing_doctor_id = db.query(Doctor).join(User, Doctor.user_id == User.id).filter(
-                and_(
-                    Doctor.doctor_id == doctor_update.doctor_id,
-                    Doctor.id != doctor_id,
-                    Doctor.deleted_at.is_(None),
-                    User.deleted_at.is_(None)
-                )
-            ).first()
-            
-            if existing_doctor_id:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="A doctor with this doctor ID already exists"
-                )
-        
-        # Check for email conflicts if email is being updated
-        if doctor_update.email and doctor_update.email != db_doctor.user.email:
-            existing_user = db.query(User).filter(
-                and_(
-                    User.email == doctor_update.email,
-                    User.id != db_doctor.user_id,
-                    User.deleted_at.is_(None)
-                )
-            ).first()
-            
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="A user with this email already exists"
-                )
-        
-        # Update user fields
-        user_fields = ['email', 'first_name', 'last_name', 'phone', 'city', 'age', 'address', 'gender']
-        user_update_data = {k: v for k, v in doctor_update.dict(exclude_unset=True).items() if k in user_fields}
-        
-        if user_update_data:
-            for field, value in user_update_data.items():
-                setattr(db_doctor.user, field, value)
-            db_doctor.user.updated_at = datetime.utcnow()
-        
-        # Update doctor-specific fields
-        doctor_fields = ['doctor_id', 'qualifications', 'department', 'specialization', 'license_number']
-        doctor_update_data = {k: v for k, v in doctor_update.dict(exclude_unset=True).items() if k in doctor_fields}
-        
-        if doctor_update_data:
-            for field, value in doctor_update_data.items():
-                setattr(db_doctor, field, value)
-            db_doctor.updated_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(db_doctor)
-        
-        return create_doctor_response(db_doctor.user, db_doctor)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+        db.flush()
+    except IntegrityError as e:
         db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update doctor record"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=doctor_conflict_detail(e)
         )
+    
+    # Build the response from the flushed state before commit expires it,
+    # so nothing has to be re-read afterwards
+    response = create_doctor_response(db_doctor.user, db_doctor)
+    db.commit()
+    
+    return response
 
 
 @router.delete("/{doctor_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_doctor(
+def delete_doctor(
     doctor_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -483,32 +488,32 @@ async def delete_doctor(
     
     Requires: Admin role only
     """
-    try:
-        # Get existing doctor with user data
-        db_doctor = db.query(Doctor).join(User, Doctor.user_id == User.id).options(joinedload(Doctor.user)).filter(
-            and_(Doctor.id == doctor_id, Doctor.deleted_at.is_(None), User.deleted_at.is_(None))
-        ).first()
-        
-        if not db_doctor:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Doctor not found"
-            )
-        
-        # Perform soft delete on both records
-        delete_time = datetime.utcnow()
-        db_doctor.deleted_at = delete_time
-        db_doctor.user.deleted_at = delete_time
-        
-        db.commit()
-        
-        return None
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    # Perform soft delete on both records with direct UPDATEs; the doctor
+    # UPDATE only matches a live doctor of a live user and returns the
+    # user to delete, so no row is loaded first
+    delete_time = datetime.utcnow()
+    user_id = db.execute(
+        update(Doctor).where(
+            Doctor.id == doctor_id,
+            Doctor.deleted_at.is_(None),
+            Doctor.user_id.in_(select(User.id).where(User.deleted_at.is_(None)))
+        ).values(deleted_at=delete_time).returning(Doctor.user_id)
+    ).scalar_one_or_none()
+    
+    if user_id is None:
         db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete doctor record"
-        )
\ No newline at end of file
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    
+    username = db.execute(
+        update(User).where(User.id == user_id).values(deleted_at=delete_time).returning(User.username)
+    ).scalar_one()
+    
+    db.commit()
+    invalidate_profile_status(user_id)
+    # Core UPDATEs bypass the ORM event that drops cached users
+    invalidate_user(username)
+    
+    return None
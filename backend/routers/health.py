@@ -1,7 +1,11 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 import os
 
-router = APIRouter(tags=["health"])
+# Resolved once at import: the environment does not change while the process runs
+DATABASE_STATUS = "configured" if os.getenv("DATABASE_URL") else "not configured"
+
+router = APIRouter(tags=["health"], default_response_class=ORJSONResponse)
 
 @router.get("/")
 def read_root():
@@ -11,5 +15,4 @@ def read_root():
 @router.get("/api/health")
 def health_check():
     """Health check endpoint"""
-    db_configured = "configured" if os.getenv("DATABASE_URL") else "not configured"
-    return {"status": "healthy", "database": db_configured}
+    return {"status": "healthy", "database": DATABASE_STATUS}
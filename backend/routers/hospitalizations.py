@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, contains_eager, joinedload, raiseload, selectinload
+from sqlalchemy import and_, func, or_, tuple_, update
 from typing import Optional
 from datetime import datetime
 
@@ -8,15 +9,29 @@ from database import get_db
 from models import Hospitalization, Patient, User, UserRole, Doctor
 from schemas import HospitalizationCreate, HospitalizationUpdate, HospitalizationResponse, DoctorInfo, PaginatedHospitalizationsResponse
 import auth as auth_utils
+from core.cache import hospitalization_cache, invalidate_hospitalizations
+from core.pagination import decode_cursor, encode_cursor
 
-router = APIRouter(prefix="/api/hospitalizations", tags=["hospitalizations"])
+router = APIRouter(
+    prefix="/api/hospitalizations",
+    tags=["hospitalizations"],
+    default_response_class=ORJSONResponse
+)
+
+# Roles that may read and manage hospitalization records
+HOSPITALIZATION_ROLES = frozenset({
+    UserRole.ADMIN,
+    UserRole.DOCTOR,
+    UserRole.MEDICAL_STAFF,
+    UserRole.RECEPTIONIST,
+})
 
 
 def require_hospitalization_access(current_user: User = Depends(auth_utils.get_current_user)) -> User:
     """
     Require admin, doctor, medical_staff, or receptionist role for hospitalization access.
     """
-    if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.MEDICAL_STAFF, UserRole.RECEPTIONIST]:
+    if current_user.role not in HOSPITALIZATION_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied. Requires admin, doctor, medical staff, or receptionist role."
@@ -24,8 +39,72 @@ def require_hospitalization_access(current_user: User = Depends(auth_utils.get_c
     return current_user
 
 
+def hospitalization_response_query(db: Session):
+    """
+    Query hospitalizations with everything a response reads loaded up front.
+    
+    The patient and patient user are joined (the join also serves the list
+    search filter), and doctors come from one selectin IN query with their
+    users joined in, so a response costs two statements whatever the doctor
+    count and never lazy-loads. Every
+    other relationship is raiseload'ed: touching one fails immediately
+    instead of quietly issuing a query per row, so a new field needs its
+    loader declared here.
+    
+    Only to-one relationships are joined. Joining the doctors collection
+    would repeat each hospitalization row once per doctor, which the ORM
+    then has to deduplicate and which forces LIMIT into a subquery, so
+    collections stay on selectinload.
+    """
+    return db.query(Hospitalization).join(
+        Hospitalization.patient
+    ).join(
+        Patient.user
+    ).options(
+        contains_eager(Hospitalization.patient).contains_eager(Patient.user),
+        selectinload(Hospitalization.doctors).joinedload(Doctor.user),
+        raiseload('*')
+    )
+
+
+def create_hospitalization_response(hospitalization: Hospitalization) -> dict:
+    """
+    Build a HospitalizationResponse dict from a row loaded by hospitalization_response_query.
+    
+    Create, update, list and detail all go through here, so this is the one
+    place whose attribute reads must match the loaders declared above.
+    """
+    patient_user = hospitalization.patient.user
+    doctor_infos = []
+    for doctor in hospitalization.doctors:
+        doctor_user = doctor.user
+        doctor_infos.append({
+            "id": doctor.id,
+            "doctor_id": doctor.doctor_id,
+            "first_name": doctor_user.first_name,
+            "last_name": doctor_user.last_name,
+            "specialization": doctor.specialization,
+        })
+    
+    return {
+        "id": hospitalization.id,
+        "patient_id": hospitalization.patient_id,
+        "admission_date": hospitalization.admission_date,
+        "discharge_date": hospitalization.discharge_date,
+        "diagnosis": hospitalization.diagnosis,
+        "summary": hospitalization.summary,
+        "created_at": hospitalization.created_at,
+        "updated_at": hospitalization.updated_at,
+        "deleted_at": hospitalization.deleted_at,
+        "patient_first_name": patient_user.first_name,
+        "patient_last_name": patient_user.last_name,
+        "patient_age": patient_user.age,
+        "doctors": doctor_infos,
+    }
+
+
 @router.post("", response_model=HospitalizationResponse, status_code=status.HTTP_201_CREATED)
-async def create_hospitalization(
+def create_hospitalization(
     hospitalization_data: HospitalizationCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_hospitalization_access)
@@ -51,64 +130,46 @@ async def create_hospitalization(
             )
         
         # Parse dates
-        admission_date = datetime.fromisoformat(hospitalization_data.admission_date.replace('Z', '+00:00'))
+        admission_date = datetime.fromisoformat(hospitalization_data.admission_date)
         discharge_date = None
         if hospitalization_data.discharge_date:
-            discharge_date = datetime.fromisoformat(hospitalization_data.discharge_date.replace('Z', '+00:00'))
+            discharge_date = datetime.fromisoformat(hospitalization_data.discharge_date)
         
-        # Create hospitalization
+        # Look up doctors to assign, if provided
+        doctors = []
+        if hospitalization_data.doctor_ids:
+            doctors = db.query(Doctor).filter(
+                and_(
+                    Doctor.id.in_(hospitalization_data.doctor_ids),
+                    Doctor.deleted_at.is_(None)
+                )
+            ).all()
+        
+        # Create hospitalization; doctors are set on the new object so there is
+        # no existing collection to load before replacing it
         db_hospitalization = Hospitalization(
             patient_id=hospitalization_data.patient_id,
             admission_date=admission_date,
             discharge_date=discharge_date,
             diagnosis=hospitalization_data.diagnosis,
-            summary=hospitalization_data.summary
+            summary=hospitalization_data.summary,
+            doctors=doctors
         )
         
         db.add(db_hospitalization)
         db.flush()  # Get the ID without committing
         
-        # Assign doctors if provided
-        if hospitalization_data.doctor_ids:
-            doctors = db.query(Doctor).filter(
-                and_(
-                    Doctor.id.in_(hospitalization_data.doctor_ids),
-                    Doctor.deleted_at.is_(None)
-                )
-            ).all()
-            db_hospitalization.doctors = doctors
-        
+        # Read before commit: touching the expired row afterwards would refresh it
+        hospitalization_id = db_hospitalization.id
         db.commit()
-        db.refresh(db_hospitalization)
+        invalidate_hospitalizations()
         
-        # Build response with patient and doctor info
-        patient_user = db.query(User).filter(User.id == patient.user_id).first()
-        doctor_infos = []
-        for doctor in db_hospitalization.doctors:
-            doctor_user = db.query(User).filter(User.id == doctor.user_id).first()
-            doctor_infos.append({
-                "id": doctor.id,
-                "doctor_id": doctor.doctor_id,
-                "first_name": doctor_user.first_name,
-                "last_name": doctor_user.last_name,
-                "specialization": doctor.specialization,
-            })
-        
-        return {
-            "id": db_hospitalization.id,
-            "patient_id": db_hospitalization.patient_id,
-            "admission_date": db_hospitalization.admission_date,
-            "discharge_date": db_hospitalization.discharge_date,
-            "diagnosis": db_hospitalization.diagnosis,
-            "summary": db_hospitalization.summary,
-            "created_at": db_hospitalization.created_at,
-            "updated_at": db_hospitalization.updated_at,
-            "deleted_at": db_hospitalization.deleted_at,
-            "patient_first_name": patient_user.first_name if patient_user else None,
-            "patient_last_name": patient_user.last_name if patient_user else None,
-            "patient_age": patient_user.age if patient_user else None,
-            "doctors": doctor_infos,
-        }
+        # Reload with patient and doctor info for the response
+        db_hospitalization = hospitalization_response_query(db).filter(
+            Hospitalization.id == hospitalization_id
+        ).one()
+        
+        return create_hospitalization_response(db_hospitalization)
         
     except HTTPException:
         raise
@@ -126,12 +187,13 @@ async def create_hospitalization(
 
 
 @router.get("", response_model=PaginatedHospitalizationsResponse)
-async def get_hospitalizations(
+def get_hospitalizations(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of records per page"),
     patient_id: Optional[int] = Query(None, description="Filter by patient ID"),
     active_only: bool = Query(False, description="Show only active hospitalizations (not discharged)"),
     search: Optional[str] = Query(None, description="Search by patient name or diagnosis"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_hospitalization_access)
 ):
@@ -143,20 +205,25 @@ async def get_hospitalizations(
     - active_only: Show only active hospitalizations (discharge_date is NULL)
     - search: Search by patient name or diagnosis
     
+    Pages can be requested by number or by passing the previous response's
+    next_cursor; cursor requests seek straight to the position instead of
+    skipping rows, and do not compute total counts.
+    
     Requires: Admin, Doctor, Medical Staff, or Receptionist role
     """
+    if cursor is not None:
+        cursor_admission_date, cursor_id = decode_cursor(cursor)
+    
+    # Repeat reads are served from the already serialized body; the write
+    # endpoints below invalidate it
+    cache_key = ("list", page, page_size, patient_id, active_only, search, cursor)
+    body = hospitalization_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
     try:
-        # Join with Patient and User to get patient details
-        query = db.query(
-            Hospitalization,
-            User.first_name,
-            User.last_name,
-            User.age
-        ).join(
-            Patient, Hospitalization.patient_id == Patient.id
-        ).join(
-            User, Patient.user_id == User.id
-        ).filter(
+        # Joined with Patient and User, so the search can filter on patient names
+        query = hospitalization_response_query(db).filter(
             Hospitalization.deleted_at.is_(None)
         )
         
@@ -177,56 +244,45 @@ async def get_hospitalizations(
                 )
             )
         
-        # Get total count
-        total = query.count()
-        
-        # Calculate pagination
-        total_pages = (total + page_size - 1) // page_size
-        offset = (page - 1) * page_size
+        # Newest admissions first; id breaks ties so the order is total
+        order = (Hospitalization.admission_date.desc(), Hospitalization.id.desc())
+        
+        if cursor is not None:
+            # Keyset pagination: continue after the last row already seen
+            results = query.filter(
+                tuple_(Hospitalization.admission_date, Hospitalization.id) < tuple_(cursor_admission_date, cursor_id)
+            ).order_by(*order).limit(page_size).all()
+            total = None
+            total_pages = None
+        else:
+            # Get total count
+            total = query.count()
+            
+            # Calculate pagination
+            total_pages = (total + page_size - 1) // page_size
+            offset = (page - 1) * page_size
+            
+            # Get paginated results
+            results = query.order_by(*order).offset(offset).limit(page_size).all()
         
-        # Get paginated results
-        results = query.order_by(Hospitalization.admission_date.desc()).offset(offset).limit(page_size).all()
+        next_cursor = None
+        if len(results) == page_size:
+            next_cursor = encode_cursor(results[-1].admission_date, results[-1].id)
         
         # Build response with patient and doctor info
-        hospitalizations = []
-        for hospitalization, first_name, last_name, age in results:
-            # Get doctors for this hospitalization
-            doctor_infos = []
-            for doctor in hospitalization.doctors:
-                doctor_user = db.query(User).filter(User.id == doctor.user_id).first()
-                if doctor_user:
-                    doctor_infos.append({
-                        "id": doctor.id,
-                        "doctor_id": doctor.doctor_id,
-                        "first_name": doctor_user.first_name,
-                        "last_name": doctor_user.last_name,
-                        "specialization": doctor.specialization,
-                    })
-            
-            hosp_dict = {
-                "id": hospitalization.id,
-                "patient_id": hospitalization.patient_id,
-                "admission_date": hospitalization.admission_date,
-                "discharge_date": hospitalization.discharge_date,
-                "diagnosis": hospitalization.diagnosis,
-                "summary": hospitalization.summary,
-                "created_at": hospitalization.created_at,
-                "updated_at": hospitalization.updated_at,
-                "deleted_at": hospitalization.deleted_at,
-                "patient_first_name": first_name,
-                "patient_last_name": last_name,
-                "patient_age": age,
-                "doctors": doctor_infos,
-            }
-            hospitalizations.append(hosp_dict)
-        
-        return {
-            "hospitalizations": hospitalizations,
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": total_pages
-        }
+        hospitalizations = [create_hospitalization_response(hospitalization) for hospitalization in results]
+        
+        body = PaginatedHospitalizationsResponse(
+            hospitalizations=hospitalizations,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor
+        ).model_dump_json().encode()
+        hospitalization_cache.set(cache_key, body)
+        
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -236,7 +292,7 @@ async def get_hospitalizations(
 
 
 @router.get("/{hospitalization_id}", response_model=HospitalizationResponse)
-async def get_hospitalization(
+def get_hospitalization(
     hospitalization_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_hospitalization_access)
@@ -246,8 +302,13 @@ async def get_hospitalization(
     
     Requires: Admin, Doctor, Medical Staff, or Receptionist role
     """
+    cache_key = ("detail", hospitalization_id)
+    body = hospitalization_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
     try:
-        hospitalization = db.query(Hospitalization).filter(
+        hospitalization = hospitalization_response_query(db).filter(
             and_(
                 Hospitalization.id == hospitalization_id,
                 Hospitalization.deleted_at.is_(None)
@@ -260,7 +321,10 @@ async def get_hospitalization(
                 detail="Hospitalization record not found"
             )
         
-        return hospitalization
+        body = HospitalizationResponse(**create_hospitalization_response(hospitalization)).model_dump_json().encode()
+        hospitalization_cache.set(cache_key, body)
+        
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         raise
@@ -272,7 +336,7 @@ async def get_hospitalization(
 
 
 @router.put("/{hospitalization_id}", response_model=HospitalizationResponse)
-async def update_hospitalization(
+def update_hospitalization(
     hospitalization_id: int,
     hospitalization_update: HospitalizationUpdate,
     db: Session = Depends(get_db),
@@ -284,76 +348,65 @@ async def update_hospitalization(
     Requires: Admin, Doctor, Medical Staff, or Receptionist role
     """
     try:
-        hospitalization = db.query(Hospitalization).filter(
-            and_(
-                Hospitalization.id == hospitalization_id,
-                Hospitalization.deleted_at.is_(None)
-            )
-        ).first()
+        # Collect column values, parsing dates once up front
+        update_data = hospitalization_update.model_dump(exclude_unset=True)
+        doctor_ids = update_data.pop('doctor_ids', None)
+        for field in ('admission_date', 'discharge_date'):
+            if update_data.get(field):
+                update_data[field] = datetime.fromisoformat(update_data[field])
+        
+        active_hospitalization = and_(
+            Hospitalization.id == hospitalization_id,
+            Hospitalization.deleted_at.is_(None)
+        )
         
-        if not hospitalization:
+        if doctor_ids is None and not update_data:
+            found = db.query(Hospitalization.id).filter(active_hospitalization).first() is not None
+        elif doctor_ids is None:
+            # Column-only change: one UPDATE, which also tells whether the row exists
+            updated_id = db.execute(
+                update(Hospitalization)
+                .where(active_hospitalization)
+                .values(**update_data)
+                .returning(Hospitalization.id)
+            ).scalar_one_or_none()
+            found = updated_id is not None
+        else:
+            # Reassigning doctors goes through the ORM collection; the current
+            # doctors come in with the row so replacing them diffs in Python
+            hospitalization = db.query(Hospitalization).options(
+                selectinload(Hospitalization.doctors),
+                raiseload('*')
+            ).filter(active_hospitalization).first()
+            found = hospitalization is not None
+            if found:
+                hospitalization.doctors = db.query(Doctor).filter(
+                    and_(
+                        Doctor.id.in_(doctor_ids),
+                        Doctor.deleted_at.is_(None)
+                    )
+                ).all()
+                for field, value in update_data.items():
+                    setattr(hospitalization, field, value)
+                # A doctors-only change leaves the row clean, so onupdate
+                # would not fire; stamp it from the database clock directly
+                hospitalization.updated_at = func.now()
+        
+        if not found:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Hospitalization record not found"
             )
         
-        # Update fields
-        update_data = hospitalization_update.dict(exclude_unset=True)
-        
-        if update_data:
-            for field, value in update_data.items():
-                if field == 'doctor_ids':
-                    # Update doctor assignments
-                    if value is not None:
-                        doctors = db.query(Doctor).filter(
-                            and_(
-                                Doctor.id.in_(value),
-                                Doctor.deleted_at.is_(None)
-                            )
-                        ).all()
-                        hospitalization.doctors = doctors
-                elif field in ['admission_date', 'discharge_date'] and value:
-                    value = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                    setattr(hospitalization, field, value)
-                else:
-                    setattr(hospitalization, field, value)
-            
-            hospitalization.updated_at = datetime.utcnow()
-        
         db.commit()
-        db.refresh(hospitalization)
+        invalidate_hospitalizations()
         
-        # Build response with patient and doctor info
-        patient = db.query(Patient).filter(Patient.id == hospitalization.patient_id).first()
-        patient_user = db.query(User).filter(User.id == patient.user_id).first() if patient else None
-        
-        doctor_infos = []
-        for doctor in hospitalization.doctors:
-            doctor_user = db.query(User).filter(User.id == doctor.user_id).first()
-            if doctor_user:
-                doctor_infos.append({
-                    "id": doctor.id,
-                    "doctor_id": doctor.doctor_id,
-                    "first_name": doctor_user.first_name,
-                    "last_name": doctor_user.last_name,
-                    "specialization": doctor.specialization,
-                })
-        
-        return {
-            "id": hospitalization.id,
-            "patient_id": hospitalization.patient_id,
-            "admission_date": hospitalization.admission_date,
-            "discharge_date": hospitalization.discharge_date,
-            "diagnosis": hospitalization.diagnosis,
-            "summary": hospitalization.summary,
-            "created_at": hospitalization.created_at,
-            "updated_at": hospitalization.updated_at,
-            "deleted_at": hospitalization.deleted_at,
-            "patient_first_name": patient_user.first_name if patient_user else None,
-            "patient_last_name": patient_user.last_name if patient_user else None,
-            "patient_age": patient_user.age if patient_user else None,
-            "doctors": doctor_infos,
-        }
+        # Reload with patient and doctor info for the response
+        hospitalization = hospitalization_response_query(db).filter(
+            Hospitalization.id == hospitalization_id
+        ).one()
+        
+        return create_hospitalization_response(hospitalization)
         
     except HTTPException:
         raise
@@ -371,7 +424,7 @@ async def update_hospitalization(
 
 
 @router.delete("/{hospitalization_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_hospitalization(
+def delete_hospitalization(
     hospitalization_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_hospitalization_access)
@@ -382,22 +435,25 @@ async def delete_hospitalization(
     Requires: Admin, Doctor, Medical Staff, or Receptionist role
     """
     try:
-        hospitalization = db.query(Hospitalization).filter(
-            and_(
+        # Soft delete in one UPDATE; nothing is returned, so the row is never loaded
+        result = db.execute(
+            update(Hospitalization)
+            .where(
                 Hospitalization.id == hospitalization_id,
                 Hospitalization.deleted_at.is_(None)
             )
-        ).first()
+            .values(deleted_at=func.now())
+        )
         
-        if not hospitalization:
+        if result.rowcount == 0:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Hospitalization record not found"
             )
         
-        # Soft delete
-        hospitalization.deleted_at = datetime.utcnow()
         db.commit()
+        invalidate_hospitalizations()
         
         return None
         
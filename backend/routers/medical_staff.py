@@ -1,16 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import func, or_, and_, select, tuple_, update
 from typing import Optional
-from datetime import datetime
+import orjson
 
 from database import get_db
-from models import MedicalStaff, User, UserRole
+from models import MedicalStaff, User, UserRole, user_search_text
 from schemas import MedicalStaffCreate, MedicalStaffUpdate, MedicalStaffResponse
 from core.dependencies import require_admin
 import auth as auth_utils
+from core.cache import invalidate_medical_staff_list, list_count_cache, medical_staff_list_cache
+from core.pagination import decode_cursor, encode_cursor
 
-router = APIRouter(prefix="/api/medical-staff", tags=["medical-staff"])
+router = APIRouter(
+    prefix="/api/medical-staff",
+    tags=["medical-staff"],
+    default_response_class=ORJSONResponse
+)
+
+# Columns selected by the staff list; profile timestamps are kept apart
+# because users without a profile report their own
+MEDICAL_STAFF_LIST_COLUMNS = (
+    MedicalStaff.id.label("id"),
+    User.id.label("user_id"),
+    MedicalStaff.job_title,
+    MedicalStaff.department,
+    MedicalStaff.shift_schedule,
+    User.first_name,
+    User.last_name,
+    User.email,
+    User.phone,
+    User.role,
+    MedicalStaff.created_at.label("profile_created_at"),
+    MedicalStaff.updated_at.label("profile_updated_at"),
+    User.created_at.label("created_at"),
+    User.updated_at.label("updated_at"),
+)
+
+
+def medical_staff_response_query(db: Session):
+    """
+    Query medical staff records with their user loaded from the same join.
+    
+    The join is needed anyway to filter out deleted users; contains_eager
+    fills MedicalStaff.user from it instead of joining users a second time.
+    """
+    return db.query(MedicalStaff).join(MedicalStaff.user).options(contains_eager(MedicalStaff.user))
 
 
 def create_medical_staff_response(user: User, medical_staff: MedicalStaff) -> MedicalStaffResponse:
@@ -32,7 +68,7 @@ def create_medical_staff_response(user: User, medical_staff: MedicalStaff) -> Me
 
 
 @router.post("", response_model=MedicalStaffResponse, status_code=status.HTTP_201_CREATED)
-async def create_medical_staff(
+def create_medical_staff(
     medical_staff_data: MedicalStaffCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -78,8 +114,8 @@ async def create_medical_staff(
                 existing_staff.department = medical_staff_data.department
                 existing_staff.shift_schedule = medical_staff_data.shift_schedule
                 existing_staff.deleted_at = None
-                existing_staff.updated_at = datetime.utcnow()
                 db.commit()
+                invalidate_medical_staff_list()
                 db.refresh(existing_staff)
                 db_medical_staff = existing_staff
         else:
@@ -92,6 +128,7 @@ async def create_medical_staff(
             )
             db.add(db_medical_staff)
             db.commit()
+            invalidate_medical_staff_list()
             db.refresh(db_medical_staff)
         
         return create_medical_staff_response(target_user, db_medical_staff)
@@ -107,21 +144,40 @@ async def create_medical_staff(
 
 
 @router.get("")
-async def get_medical_staff_list(
+def get_medical_staff_list(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
     search: Optional[str] = Query(None, description="Search by first name, last name, or email"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """
     Get paginated list of all users with medical_staff or receptionist role, regardless of profile completion status.
     
+    Pages can be requested by number or by passing the previous response's
+    next_cursor; cursor requests seek straight to the position instead of
+    skipping rows, and do not compute total counts.
+    
     Requires: Admin role
     """
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+    
+    # Repeat reads are served from the already serialized page; staff and
+    # user writes invalidate it
+    cache_key = (page, page_size, search, cursor)
+    body = medical_staff_list_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
     try:
-        # Query User table with LEFT JOIN to MedicalStaff table to show all medical_staff and receptionist users
-        query = db.query(User).outerjoin(MedicalStaff, User.id == MedicalStaff.user_id).filter(
+        # Left join live profiles to show all medical_staff and receptionist
+        # users; only the listed columns are read, so no ORM objects are built
+        query = db.query(*MEDICAL_STAFF_LIST_COLUMNS).outerjoin(
+            MedicalStaff,
+            and_(User.id == MedicalStaff.user_id, MedicalStaff.deleted_at.is_(None))
+        ).filter(
             or_(
                 User.role == UserRole.MEDICAL_STAFF,
                 User.role == UserRole.RECEPTIONIST
@@ -134,53 +190,83 @@ async def get_medical_staff_list(
         # Apply search filter if provided
         if search:
             search_term = f"%{search.strip()}%"
-            query = query.filter(
-                or_(
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term),
-                    User.email.ilike(search_term)
-                )
-            )
+            # Backed by the trigram GIN index on the same expression
+            query = query.filter(user_search_text.ilike(search_term))
         
-        # Get total count before pagination
-        total_count = query.count()
+        # Newest first; id breaks ties so the order is total
+        order = (User.created_at.desc(), User.id.desc())
         
-        # Apply pagination
-        offset = (page - 1) * page_size
-        users_data = query.options(joinedload(User.medical_staff)).order_by(User.created_at.desc()).offset(offset).limit(page_size).all()
+        if cursor is not None:
+            # Keyset pagination: continue after the last row already seen
+            users_data = query.filter(
+                tuple_(User.created_at, User.id) < tuple_(cursor_created_at, cursor_id)
+            ).order_by(*order).limit(page_size).all()
+            total_count = None
+            total_pages = None
+        else:
+            # Apply pagination
+            offset = (page - 1) * page_size
+            page_query = query.order_by(*order).offset(offset).limit(page_size)
+            
+            # Totals are cached per search, so paging through a listing counts once
+            count_key = ("medical_staff", search)
+            total_count = list_count_cache.get(count_key)
+            
+            if total_count is not None:
+                users_data = page_query.all()
+            else:
+                # The total match count comes from a window function in the same statement
+                results = page_query.add_columns(func.count().over().label("total")).all()
+                
+                if results:
+                    total_count = results[0].total
+                elif page > 1:
+                    # Past the last page there are no rows to carry the total
+                    total_count = query.count()
+                else:
+                    total_count = 0
+                users_data = results
+                list_count_cache.set(count_key, total_count)
+            
+            # Calculate pagination info
+            total_pages = (total_count + page_size - 1) // page_size
+        
+        next_cursor = None
+        if len(users_data) == page_size and users_data[-1].created_at is not None:
+            next_cursor = encode_cursor(users_data[-1].created_at, users_data[-1].user_id)
         
         # Convert to response format
         items = []
-        for user in users_data:
-            medical_staff = user.medical_staff
-            has_profile = medical_staff is not None and medical_staff.deleted_at is None
+        for row in users_data:
+            has_profile = row.id is not None
             
             items.append({
-                "id": medical_staff.id if has_profile else None,
-                "user_id": user.id,
-                "job_title": medical_staff.job_title if has_profile else None,
-                "department": medical_staff.department if has_profile else None,
-                "shift_schedule": medical_staff.shift_schedule if has_profile else None,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "email": user.email,
-                "phone": user.phone,
-                "role": user.role,
-                "created_at": medical_staff.created_at if has_profile else user.created_at,
-                "updated_at": medical_staff.updated_at if has_profile else user.updated_at,
-                "deleted_at": medical_staff.deleted_at if has_profile else None,
+                "id": row.id,
+                "user_id": row.user_id,
+                "job_title": row.job_title,
+                "department": row.department,
+                "shift_schedule": row.shift_schedule,
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "email": row.email,
+                "phone": row.phone,
+                "role": row.role,
+                "created_at": row.profile_created_at if has_profile else row.created_at,
+                "updated_at": row.profile_updated_at if has_profile else row.updated_at,
+                "deleted_at": None,
             })
         
-        # Calculate pagination info
-        total_pages = (total_count + page_size - 1) // page_size
-        
-        return {
+        body = orjson.dumps({
             "items": items,
             "total": total_count,
             "page": page,
             "page_size": page_size,
-            "total_pages": total_pages
-        }
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
+        })
+        medical_staff_list_cache.set(cache_key, body)
+        
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -190,7 +276,7 @@ async def get_medical_staff_list(
 
 
 @router.get("/{medical_staff_id}", response_model=MedicalStaffResponse)
-async def get_medical_staff(
+def get_medical_staff(
     medical_staff_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -201,7 +287,7 @@ async def get_medical_staff(
     Requires: Admin role
     """
     try:
-        db_medical_staff = db.query(MedicalStaff).join(User, MedicalStaff.user_id == User.id).options(joinedload(MedicalStaff.user)).filter(
+        db_medical_staff = medical_staff_response_query(db).filter(
             and_(
                 MedicalStaff.id == medical_staff_id,
                 MedicalStaff.deleted_at.is_(None),
@@ -227,7 +313,7 @@ async def get_medical_staff(
 
 
 @router.put("/{medical_staff_id}", response_model=MedicalStaffResponse)
-async def update_medical_staff(
+def update_medical_staff(
     medical_staff_id: int,
     medical_staff_update: MedicalStaffUpdate,
     db: Session = Depends(get_db),
@@ -239,7 +325,32 @@ async def update_medical_staff(
     Requires: Admin role
     """
     try:
-        db_medical_staff = db.query(MedicalStaff).join(User, MedicalStaff.user_id == User.id).options(joinedload(MedicalStaff.user)).filter(
+        update_data = medical_staff_update.dict(exclude_unset=True)
+        
+        if update_data:
+            # One UPDATE that only matches a live record of a live user, so
+            # no row is loaded before writing; updated_at is set by the
+            # column's onupdate=func.now()
+            updated_id = db.execute(
+                update(MedicalStaff).where(
+                    MedicalStaff.id == medical_staff_id,
+                    MedicalStaff.deleted_at.is_(None),
+                    MedicalStaff.user_id.in_(select(User.id).where(User.deleted_at.is_(None)))
+                ).values(**update_data).returning(MedicalStaff.id)
+            ).scalar_one_or_none()
+            
+            if updated_id is None:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Medical staff not found"
+                )
+            
+            db.commit()
+            invalidate_medical_staff_list()
+        
+        # Read back the record with its user for the response
+        db_medical_staff = medical_staff_response_query(db).filter(
             and_(
                 MedicalStaff.id == medical_staff_id,
                 MedicalStaff.deleted_at.is_(None),
@@ -253,17 +364,6 @@ async def update_medical_staff(
                 detail="Medical staff not found"
             )
         
-        # Update medical staff fields
-        update_data = medical_staff_update.dict(exclude_unset=True)
-        
-        if update_data:
-            for field, value in update_data.items():
-                setattr(db_medical_staff, field, value)
-            db_medical_staff.updated_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(db_medical_staff)
-        
         return create_medical_staff_response(db_medical_staff.user, db_medical_staff)
         
     except HTTPException:
@@ -277,7 +377,7 @@ async def update_medical_staff(
 
 
 @router.delete("/{medical_staff_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_medical_staff(
+def delete_medical_staff(
     medical_staff_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -288,25 +388,24 @@ async def delete_medical_staff(
     Requires: Admin role
     """
     try:
-        db_medical_staff = db.query(MedicalStaff).join(User, MedicalStaff.user_id == User.id).options(joinedload(MedicalStaff.user)).filter(
-            and_(
+        # Soft delete in one UPDATE that only matches a live record of a live user
+        result = db.execute(
+            update(MedicalStaff).where(
                 MedicalStaff.id == medical_staff_id,
                 MedicalStaff.deleted_at.is_(None),
-                User.deleted_at.is_(None)
-            )
-        ).first()
+                MedicalStaff.user_id.in_(select(User.id).where(User.deleted_at.is_(None)))
+            ).values(deleted_at=func.now())
+        )
         
-        if not db_medical_staff:
+        if result.rowcount == 0:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Medical staff not found"
             )
         
-        # Perform soft delete
-        delete_time = datetime.utcnow()
-        db_medical_staff.deleted_at = delete_time
-        
         db.commit()
+        invalidate_medical_staff_list()
         
         return None
         
@@ -1,7 +1,25 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from fastapi.responses import ORJSONResponse
+import orjson
+
 from core.password_policy import PasswordPolicy
 
-router = APIRouter(prefix="/api", tags=["password-policy"])
+router = APIRouter(
+    prefix="/api",
+    tags=["password-policy"],
+    default_response_class=ORJSONResponse
+)
+
+# The policy is fixed at import, so the response body is serialized once
+_POLICY_BODY = orjson.dumps({
+    "min_length": PasswordPolicy.MIN_LENGTH,
+    "require_uppercase": PasswordPolicy.REQUIRE_UPPERCASE,
+    "require_lowercase": PasswordPolicy.REQUIRE_LOWERCASE,
+    "require_digit": PasswordPolicy.REQUIRE_DIGIT,
+    "require_special": PasswordPolicy.REQUIRE_SPECIAL,
+    "special_characters": PasswordPolicy.SPECIAL_CHARACTERS,
+    "requirements": PasswordPolicy.get_requirements_text(),
+})
 
 
 @router.get("/password-policy")
@@ -9,12 +27,4 @@ async def get_password_policy():
     """
     Get password policy requirements
     """
-    return {
-        "min_length": PasswordPolicy.MIN_LENGTH,
-        "require_uppercase": PasswordPolicy.REQUIRE_UPPERCASE,
-        "require_lowercase": PasswordPolicy.REQUIRE_LOWERCASE,
-        "require_digit": PasswordPolicy.REQUIRE_DIGIT,
-        "require_special": PasswordPolicy.REQUIRE_SPECIAL,
-        "special_characters": PasswordPolicy.SPECIAL_CHARACTERS,
-        "requirements": PasswordPolicy.get_requirements_text(),
-    }
+    return Response(content=_POLICY_BODY, media_type="application/json")
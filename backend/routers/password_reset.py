@@ -1,23 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
 import models
 import schemas
 from database import get_db
-from core.security import create_reset_token, create_reset_token_expiry, get_password_hash
+from core.security import create_reset_token, create_reset_token_expiry, get_password_hash, hash_reset_token
 from core.email import send_password_reset_email
 from core.password_policy import PasswordPolicy
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/password-reset", tags=["password-reset"])
+router = APIRouter(
+    prefix="/api/password-reset",
+    tags=["password-reset"],
+    default_response_class=ORJSONResponse
+)
+
+
+def send_reset_email(to_email: str, reset_token: str, username: str) -> None:
+    """Send the password reset email and log the outcome; runs as a background task"""
+    if send_password_reset_email(to_email=to_email, reset_token=reset_token, username=username):
+        logger.info(f"Password reset email sent to {to_email}")
+    else:
+        logger.warning(f"Failed to send password reset email to {to_email}")
+
 
 @router.post("/request")
-async def request_password_reset(
+def request_password_reset(
     request: schemas.PasswordResetRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Request a password reset token"""
+    """
+    Request a password reset token.
+    
+    The email is sent after the response is returned, so a known address
+    costs the caller only the token UPDATE more than an unknown one rather
+    than a whole SMTP exchange, which would make addresses enumerable by
+    response time.
+    """
     user = db.query(models.User).filter(
         models.User.email == request.email,
         models.User.deleted_at.is_(None)
@@ -29,27 +51,24 @@ async def request_password_reset(
     
     # Generate reset token
     reset_token = create_reset_token()
-    user.reset_token = reset_token
+    # Only the hash is stored; the token itself goes out in the email
+    user.reset_token = hash_reset_token(reset_token)
     user.reset_token_expires = create_reset_token_expiry()
     
-    logger.info(f"Generated reset token for {user.username}: {reset_token[:10]}... expires at {user.reset_token_expires}")
-    
-    db.commit()
-    db.refresh(user)
-    
-    logger.info(f"Token saved to database for {user.username}")
-    
-    # Send email with reset link
-    email_sent = send_password_reset_email(
+    # Send email with reset link. Queued before the commit so the user's
+    # values are read while still loaded; the task only runs once the
+    # response is sent, and not at all if the commit fails
+    username = user.username
+    background_tasks.add_task(
+        send_reset_email,
         to_email=user.email,
         reset_token=reset_token,
-        username=user.username
+        username=username
     )
     
-    if email_sent:
-        logger.info(f"Password reset email sent to {user.email}")
-    else:
-        logger.warning(f"Failed to send password reset email to {user.email}")
+    db.commit()
+    
+    logger.debug("Reset token saved for %s", username)
     
     # Always return success to prevent email enumeration
     return {
@@ -57,24 +76,20 @@ async def request_password_reset(
     }
 
 @router.post("/reset")
-async def reset_password(
+def reset_password(
     reset_data: schemas.PasswordReset,
     db: Session = Depends(get_db)
 ):
     """Reset password using token"""
-    logger.info(f"Attempting password reset with token: {reset_data.token[:10]}...")
-    
     user = db.query(models.User).filter(
-        models.User.reset_token == reset_data.token,
+        models.User.reset_token == hash_reset_token(reset_data.token),
         models.User.deleted_at.is_(None)
     ).first()
     
     if not user:
-        logger.warning(f"No user found with reset token: {reset_data.token[:10]}...")
+        logger.warning("Password reset attempted with an unknown token")
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
     
-    logger.info(f"Found user: {user.username}, checking expiration...")
-    
     # Check if token is expired
     if user.reset_token_expires < datetime.utcnow():
         logger.warning(f"Token expired for user: {user.username}")
@@ -98,24 +113,20 @@ async def reset_password(
     return {"message": "Password reset successfully"}
 
 @router.get("/verify-token")
-async def verify_reset_token(
+def verify_reset_token(
     token: str,
     db: Session = Depends(get_db)
 ):
     """Verify if a reset token is valid"""
-    logger.info(f"Verifying token: {token[:10]}...")
-    
     user = db.query(models.User).filter(
-        models.User.reset_token == token,
+        models.User.reset_token == hash_reset_token(token),
         models.User.deleted_at.is_(None)
     ).first()
     
     if not user:
-        logger.warning(f"No user found with token: {token[:10]}...")
+        logger.warning("Reset token verification failed for an unknown token")
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
     
-    logger.info(f"Token found for user: {user.username}, expires: {user.reset_token_expires}")
-    
     # Check if token is expired
     if user.reset_token_expires < datetime.utcnow():
         logger.warning(f"Token expired for user: {user.username}")
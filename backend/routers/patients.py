@@ -1,16 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import func, or_, and_, select, tuple_, update
 from typing import List, Optional
 from datetime import datetime
 
 from database import get_db
-from models import Patient, User, UserRole
+from models import Patient, User, UserRole, user_search_text
 from schemas import PatientProfileCreate, PatientUpdate, PatientResponse, PaginatedPatientsResponse, PatientProfileStatus, UserResponse, PaginatedUsersResponse
 from core.dependencies import require_patient_access, require_receptionist_or_admin, require_admin, require_patient_role
 import auth as auth_utils
+from core.cache import invalidate_list_counts, invalidate_profile_status, invalidate_user, list_count_cache
+from core.pagination import decode_cursor, encode_cursor
 
-router = APIRouter(prefix="/api/patients", tags=["patients"])
+router = APIRouter(
+    prefix="/api/patients",
+    tags=["patients"],
+    default_response_class=ORJSONResponse
+)
+
+# Columns selected by the patients list, labelled after PatientResponse fields
+PATIENT_LIST_COLUMNS = (
+    Patient.id.label("id"),
+    Patient.medical_record_number,
+    Patient.emergency_contact,
+    Patient.insurance_info,
+    User.id.label("user_id"),
+    User.email,
+    User.username,
+    User.first_name,
+    User.last_name,
+    User.phone,
+    User.city,
+    User.age,
+    User.address,
+    User.gender,
+    User.role,
+    Patient.created_at.label("profile_completed_at"),
+    User.created_at.label("created_at"),
+    User.updated_at.label("updated_at"),
+    User.deleted_at.label("deleted_at"),
+)
 
 
 def create_patient_response(user: User, patient: Patient = None) -> PatientResponse:
@@ -47,7 +77,7 @@ def create_patient_response(user: User, patient: Patient = None) -> PatientRespo
 
 
 @router.post("/profile", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
-async def complete_patient_profile(
+def complete_patient_profile(
     patient_profile: PatientProfileCreate,
     user_id: Optional[int] = None,
     db: Session = Depends(get_db),
@@ -120,6 +150,7 @@ async def complete_patient_profile(
         db.add(db_patient)
         db.commit()
         db.refresh(db_patient)
+        invalidate_profile_status(target_user.id)
         
         # Return combined response
         return create_patient_response(target_user, db_patient)
@@ -135,7 +166,7 @@ async def complete_patient_profile(
 
 
 @router.get("/profile/status", response_model=PatientProfileStatus)
-async def get_patient_profile_status(
+def get_patient_profile_status(
     user_id: Optional[int] = None,
     current_user: User = Depends(auth_utils.get_current_user),
     db: Session = Depends(get_db)
@@ -192,12 +223,13 @@ async def get_patient_profile_status(
 
 
 @router.get("", response_model=PaginatedPatientsResponse)
-async def get_patients(
+def get_patients(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of records per page"),
     search: Optional[str] = Query(None, description="Search by first name, last name, email, or phone"),
     include_deleted: bool = Query(False, description="Include soft-deleted records (Admin only)"),
     hospitalization_status: Optional[str] = Query(None, description="Filter by hospitalization status: 'hospitalized', 'my-patients'"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_patient_access)
 ):
@@ -209,7 +241,14 @@ async def get_patients(
     Filters:
     - hospitalization_status='hospitalized': Only currently hospitalized patients
     - hospitalization_status='my-patients': Only current doctor's hospitalized patients
+    
+    Pages can be requested by number or by passing the previous response's
+    next_cursor; cursor requests seek straight to the position instead of
+    skipping rows, and do not compute total counts.
     """
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+    
     try:
         from models import Hospitalization, Doctor
         from sqlalchemy import func
@@ -239,7 +278,7 @@ async def get_patients(
                 ).distinct().subquery()
                 
                 # Now query User objects via Patient IDs
-                query = db.query(User).join(
+                query = db.query(*PATIENT_LIST_COLUMNS).select_from(User).join(
                     Patient,
                     and_(
                         User.id == Patient.user_id,
@@ -280,7 +319,7 @@ async def get_patients(
                     ).distinct().subquery()
                     
                     # Now query User objects via Patient IDs
-                    query = db.query(User).join(
+                    query = db.query(*PATIENT_LIST_COLUMNS).select_from(User).join(
                         Patient,
                         and_(
                             User.id == Patient.user_id,
@@ -290,9 +329,9 @@ async def get_patients(
                     ).filter(User.role == UserRole.PATIENT)
         else:
             # For no filter or "all", use left outer join to show all patients
-            query = db.query(User).outerjoin(
+            query = db.query(*PATIENT_LIST_COLUMNS).select_from(User).outerjoin(
                 Patient,
-                User.id == Patient.user_id
+                and_(User.id == Patient.user_id, Patient.deleted_at.is_(None))
             ).filter(User.role == UserRole.PATIENT)
         
         # Filter out soft-deleted records unless specifically requested by admin
@@ -302,40 +341,81 @@ async def get_patients(
         # Apply search filter if provided
         if search:
             search_term = f"%{search.strip()}%"
+            # Both expressions are backed by trigram GIN indexes
             query = query.filter(
                 or_(
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term),
-                    User.email.ilike(search_term),
+                    user_search_text.ilike(search_term),
                     User.phone.ilike(search_term)
                 )
             )
         
-        # Get total count
-        total = query.count()
-        
-        # Calculate pagination
-        total_pages = (total + page_size - 1) // page_size
-        offset = (page - 1) * page_size
+        # Newest first; id breaks ties so the order is total. Profile columns
+        # come from the patients join above, so no ORM objects are built
+        order = (User.created_at.desc(), User.id.desc())
+        
+        if cursor is not None:
+            # Keyset pagination: continue after the last row already seen
+            users_data = query.filter(
+                tuple_(User.created_at, User.id) < tuple_(cursor_created_at, cursor_id)
+            ).order_by(*order).limit(page_size).all()
+            total = None
+            total_pages = None
+        else:
+            offset = (page - 1) * page_size
+            page_query = query.order_by(*order).offset(offset).limit(page_size)
+            
+            # Totals of the plain listing are cached per filter, so paging through
+            # it counts once; hospitalization filters change with every admission
+            count_key = None
+            total = None
+            if hospitalization_status not in ["hospitalized", "my-patients"]:
+                count_key = ("patients", search, include_deleted and current_user.role == UserRole.ADMIN)
+                total = list_count_cache.get(count_key)
+            
+            if total is not None:
+                users_data = page_query.all()
+            else:
+                # Get paginated users with optional patient data, with the total
+                # match count computed by a window function in the same statement
+                results = page_query.add_columns(func.count().over().label("total")).all()
+                
+                if results:
+                    total = results[0].total
+                elif page > 1:
+                    # Past the last page there are no rows to carry the total
+                    total = query.count()
+                else:
+                    total = 0
+                users_data = results
+                
+                if count_key is not None:
+                    list_count_cache.set(count_key, total)
+            
+            # Calculate pagination
+            total_pages = (total + page_size - 1) // page_size
         
-        # Get paginated users with optional patient data
-        users_data = query.options(joinedload(User.patient)).order_by(User.created_at.desc()).offset(offset).limit(page_size).all()
+        next_cursor = None
+        if len(users_data) == page_size and users_data[-1].created_at is not None:
+            next_cursor = encode_cursor(users_data[-1].created_at, users_data[-1].user_id)
         
-        # Convert to response format
+        # Column labels match PatientResponse fields and the values come straight
+        # from the database, so the page is serialized directly rather than
+        # validated through the response model
         patients = []
-        for user in users_data:
-            patient = user.patient
-            profile_completed = patient is not None and patient.deleted_at is None
-            
-            patients.append(create_patient_response(user, patient))
+        for row in users_data:
+            fields = row._asdict()
+            fields.pop("total", None)
+            fields["profile_completed"] = fields["id"] is not None
+            patients.append(fields)
         
-        return {
+        return ORJSONResponse({
             "patients": patients,
             "total": total,
             "page": page,
             "page_size": page_size,
-            "total_pages": total_pages
-        }
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
+        })
         
     except Exception as e:
         raise HTTPException(
@@ -345,7 +425,7 @@ async def get_patients(
 
 
 @router.get("/{user_id}", response_model=PatientResponse)
-async def get_patient(
+def get_patient(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_patient_access)
@@ -357,7 +437,7 @@ async def get_patient(
     """
     try:
         # Query User with LEFT JOIN to Patient to handle users without completed profiles
-        user = db.query(User).outerjoin(Patient, User.id == Patient.user_id).options(joinedload(User.patient)).filter(
+        user = db.query(User).outerjoin(User.patient).options(contains_eager(User.patient)).filter(
             and_(User.id == user_id, User.role == UserRole.PATIENT)
         ).first()
         
@@ -389,7 +469,7 @@ async def get_patient(
 
 
 @router.put("/{patient_id}", response_model=PatientResponse)
-async def update_patient(
+def update_patient(
     patient_id: int,
     patient_update: PatientUpdate,
     db: Session = Depends(get_db),
@@ -402,7 +482,7 @@ async def update_patient(
     """
     try:
         # Get existing patient with user data
-        db_patient = db.query(Patient).join(User, Patient.user_id == User.id).options(joinedload(Patient.user)).filter(
+        db_patient = db.query(Patient).join(Patient.user).options(contains_eager(Patient.user)).filter(
             and_(Patient.id == patient_id, Patient.deleted_at.is_(None), User.deleted_at.is_(None))
         ).first()
         
@@ -435,7 +515,6 @@ async def update_patient(
         if user_update_data:
             for field, value in user_update_data.items():
                 setattr(db_patient.user, field, value)
-            db_patient.user.updated_at = datetime.utcnow()
         
         # Update patient-specific fields
         patient_fields = ['medical_record_number', 'emergency_contact', 'insurance_info']
@@ -444,7 +523,6 @@ async def update_patient(
         if patient_update_data:
             for field, value in patient_update_data.items():
                 setattr(db_patient, field, value)
-            db_patient.updated_at = datetime.utcnow()
         
         db.commit()
         db.refresh(db_patient)
@@ -463,7 +541,7 @@ async def update_patient(
 
 
 @router.delete("/{patient_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_patient(
+def delete_patient(
     patient_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
@@ -474,23 +552,35 @@ async def delete_patient(
     Requires: Admin role only
     """
     try:
-        # Get existing patient with user data
-        db_patient = db.query(Patient).join(User, Patient.user_id == User.id).options(joinedload(Patient.user)).filter(
-            and_(Patient.id == patient_id, Patient.deleted_at.is_(None), User.deleted_at.is_(None))
-        ).first()
-        
-        if not db_patient:
+        # Perform soft delete on both records with direct UPDATEs; the patient
+        # UPDATE only matches a live patient of a live user and returns the
+        # user to delete, so no row is loaded first. now() is the transaction
+        # start time, so both rows get the same deleted_at
+        delete_time = func.now()
+        user_id = db.execute(
+            update(Patient).where(
+                Patient.id == patient_id,
+                Patient.deleted_at.is_(None),
+                Patient.user_id.in_(select(User.id).where(User.deleted_at.is_(None)))
+            ).values(deleted_at=delete_time).returning(Patient.user_id)
+        ).scalar_one_or_none()
+        
+        if user_id is None:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Patient not found"
             )
         
-        # Perform soft delete on both records
-        delete_time = datetime.utcnow()
-        db_patient.deleted_at = delete_time
-        db_patient.user.deleted_at = delete_time
+        username = db.execute(
+            update(User).where(User.id == user_id).values(deleted_at=delete_time).returning(User.username)
+        ).scalar_one()
         
         db.commit()
+        invalidate_profile_status(user_id)
+        # Core UPDATEs bypass the ORM events that drop cached users and list totals
+        invalidate_user(username)
+        invalidate_list_counts()
         
         return None
         
@@ -505,7 +595,7 @@ async def delete_patient(
 
 
 @router.get("/non-patients/list", response_model=PaginatedUsersResponse)
-async def get_non_patient_users(
+def get_non_patient_users(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of records per page"),
     search: Optional[str] = Query(None, description="Search by first name, last name, email, or phone"),
@@ -542,9 +632,7 @@ async def get_non_patient_users(
             search_term = f"%{search.strip()}%"
             query = query.filter(
                 or_(
-                    User.first_name.ilike(search_term),
-                    User.last_name.ilike(search_term),
-                    User.email.ilike(search_term),
+                    user_search_text.ilike(search_term),
                     User.phone.ilike(search_term)
                 )
             )
@@ -596,7 +684,7 @@ async def get_non_patient_users(
 
 
 @router.post("/{user_id}/convert-to-patient", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
-async def convert_user_to_patient(
+def convert_user_to_patient(
     user_id: int,
     patient_profile: PatientProfileCreate,
     db: Session = Depends(get_db),
@@ -657,6 +745,7 @@ async def convert_user_to_patient(
         db.commit()
         db.refresh(db_patient)
         db.refresh(user)
+        invalidate_profile_status(user_id)
         
         return create_patient_response(user, db_patient)
         
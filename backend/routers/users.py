@@ -10,6 +10,7 @@ import schemas
 from database import get_db
 from core.dependencies import require_admin
 from core.password_policy import PasswordPolicy
+from core.cache import invalidate_hospitalizations, invalidate_profile_status
 
 logger = logging.getLogger(__name__)
 
@@ -464,6 +465,9 @@ async def delete_user_by_admin(
         db.delete(bp_reading)  # Hard delete blood pressure readings
     
     db.commit()
+    invalidate_profile_status(user.id)
+    # Cached hospitalization bodies embed this user's name as patient or doctor
+    invalidate_hospitalizations()
     return {"message": f"User {user.username} deleted successfully"}
 
 @router.post("/users/{user_id}/restore")
@@ -482,6 +486,7 @@ async def restore_user(
     
     user.deleted_at = None
     db.commit()
+    invalidate_profile_status(user.id)
     return {"message": f"User {user.username} restored successfully"}
 
 
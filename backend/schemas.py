@@ -604,17 +604,19 @@ class DoctorResponse(BaseModel):
 # Paginated Response Schemas
 class PaginatedPatientsResponse(BaseModel):
     patients: list[PatientResponse]
-    total: int
+    total: Optional[int] = None  # Not computed for cursor requests
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
 
 class PaginatedDoctorsResponse(BaseModel):
     doctors: list[DoctorResponse]
-    total: int
+    total: Optional[int] = None  # Not computed for cursor requests
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
 
 class PasswordResetRequest(BaseModel):
     email: EmailStr
@@ -746,10 +748,11 @@ class PrescriptionBulkCreateResponse(BaseModel):
 # Paginated Response Schemas for Hospitalizations and Prescriptions
 class PaginatedHospitalizationsResponse(BaseModel):
     hospitalizations: list[HospitalizationResponse]
-    total: int
+    total: Optional[int] = None  # Not computed for cursor requests
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
 
 class PaginatedPrescriptionsResponse(BaseModel):
     prescriptions: list[PrescriptionResponse]
@@ -954,10 +957,11 @@ class BloodPressureResponse(BaseModel):
 class PaginatedBloodPressureResponse(BaseModel):
     """Schema for paginated blood pressure readings"""
     readings: list[BloodPressureResponse]
-    total: int
+    total: Optional[int] = None  # Not computed for cursor requests
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
 
 
 class BloodPressureStatistics(BaseModel):
@@ -3,9 +3,9 @@ Test configuration and fixtures for medical staff management tests.
 """
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from database import Base
+from database import Base, forbid_lazy_loads
 from models import MedicalStaff, User, UserRole
 
 
@@ -24,6 +24,8 @@ def test_db():
     
     # Create session
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Fail tests on implicit lazy loads so N+1 regressions are caught early
+    event.listen(TestingSessionLocal, "do_orm_execute", forbid_lazy_loads)
     db = TestingSessionLocal()
     
     try:
@@ -51,3 +53,45 @@ def test_user(test_db):
     test_db.commit()
     test_db.refresh(user)
     return user
+
+
+@pytest.fixture(scope="function")
+def make_users(test_db):
+    """
+    Return a factory that commits one user per (username, role) pair.
+    """
+    def make(specs, last_name="Example"):
+        users = []
+        for username, role in specs:
+            user = User(
+                email=f"{username}@example.com",
+                username=username,
+                first_name=username.title(),
+                last_name=last_name,
+                hashed_password="hashed_password",
+                role=role
+            )
+            test_db.add(user)
+            users.append(user)
+        test_db.commit()
+        return users
+    
+    return make
+
+
+@pytest.fixture(scope="function")
+def executed_statements(test_db):
+    """
+    Record the SQL statements executed while the test runs.
+    """
+    statements = []
+    engine = test_db.get_bind()
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,130 @@
+"""
+Tests for the in-process TTL cache.
+"""
+
+import auth  # noqa: F401 - registers the User write hooks
+from core.cache import (
+    TTLCache,
+    appointment_cache,
+    decoded_token_cache,
+    invalidate_appointment,
+    invalidate_profile_status,
+    list_count_cache,
+    profile_status_cache,
+    user_cache,
+)
+from core.security import create_access_token, decode_token
+from models import User, UserRole
+
+
+def test_ttl_cache_set_and_get():
+    """Test storing and reading back a value"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_ttl_cache_expiry():
+    """Test that expired entries are treated as missing"""
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_oldest_when_full():
+    """Test that the oldest entry is dropped once maxsize is reached"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_evict_predicate():
+    """Test removing entries matching a predicate"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set((1, 10), "a")
+    cache.set((1, 20), "b")
+    cache.set((2, 10), "c")
+
+    cache.evict(lambda key: key[0] == 1)
+
+    assert cache.get((1, 10)) is None
+    assert cache.get((1, 20)) is None
+    assert cache.get((2, 10)) == "c"
+
+
+def test_invalidate_profile_status():
+    """Test invalidating a cached profile completion status"""
+    profile_status_cache.set(42, ("patient", True, None))
+
+    invalidate_profile_status(42)
+
+    assert profile_status_cache.get(42) is None
+
+
+def test_invalidate_appointment_drops_every_viewer():
+    """Test that invalidating an appointment clears it for all users"""
+    appointment_cache.set((7, 1), b"{}")
+    appointment_cache.set((7, 2), b"{}")
+    appointment_cache.set((8, 1), b"{}")
+
+    invalidate_appointment(7)
+
+    assert appointment_cache.get((7, 1)) is None
+    assert appointment_cache.get((7, 2)) is None
+    assert appointment_cache.get((8, 1)) == b"{}"
+
+
+def test_decode_token_is_memoized():
+    """Test that repeat decodes of a token reuse the verified payload"""
+    token, jti, _ = create_access_token(data={"sub": "someone"})
+
+    payload = decode_token(token)
+
+    assert payload["jti"] == jti
+    assert decode_token(token) is payload
+
+
+def test_decode_token_rejects_expired_cached_payload():
+    """Test that a cached payload is not returned after its expiry"""
+    decoded_token_cache.set("stale-token", {"sub": "someone", "exp": 0})
+
+    assert decode_token("stale-token") is None
+    assert decoded_token_cache.get("stale-token") is None
+
+
+def test_user_insert_clears_list_counts(test_db):
+    """Test that adding a user through the ORM drops cached list totals"""
+    list_count_cache.set(("patients", None, False), 5)
+
+    test_db.add(User(
+        email="new@example.com",
+        username="newpatient",
+        first_name="New",
+        last_name="Patient",
+        hashed_password="hashed_password",
+        role=UserRole.PATIENT
+    ))
+    test_db.commit()
+
+    assert list_count_cache.get(("patients", None, False)) is None
+
+
+def test_user_update_clears_snapshot_cached_before_commit(test_db, test_user):
+    """Test that a snapshot cached between flush and commit is dropped on commit"""
+    test_user.role = UserRole.PATIENT
+    test_db.flush()
+    user_cache.set(test_user.username, {"role": UserRole.ADMIN})
+
+    test_db.commit()
+
+    assert user_cache.get(test_user.username) is None
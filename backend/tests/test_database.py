@@ -0,0 +1,33 @@
+"""
+Tests for the lazy-load guard applied to test sessions.
+"""
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import joinedload
+from models import MedicalStaff
+
+
+@pytest.fixture
+def medical_staff(test_db, test_user):
+    """Persist a medical staff profile and detach it from the session"""
+    staff = MedicalStaff(user_id=test_user.id, job_title="Nurse")
+    test_db.add(staff)
+    test_db.commit()
+    test_db.expunge_all()
+    return staff
+
+
+def test_lazy_load_raises(test_db, medical_staff):
+    """Test that touching an unloaded relationship fails instead of querying"""
+    staff = test_db.query(MedicalStaff).first()
+
+    with pytest.raises(InvalidRequestError):
+        staff.user
+
+
+def test_eager_load_allowed(test_db, medical_staff):
+    """Test that relationships loaded up front can be read freely"""
+    staff = test_db.query(MedicalStaff).options(joinedload(MedicalStaff.user)).first()
+
+    assert staff.user.username == "testuser"
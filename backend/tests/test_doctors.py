@@ -0,0 +1,93 @@
+"""
+Tests for the doctor listing endpoints.
+Handlers are called directly with the test session, which raises on lazy loads.
+"""
+
+import json
+
+import pytest
+from fastapi import Response
+from models import Doctor, UserRole
+from routers.doctors import get_doctor, get_doctors
+from schemas import DoctorResponse, PaginatedDoctorsResponse
+
+
+@pytest.fixture
+def doctor_user_ids(test_db, make_users):
+    """Create one doctor with a completed profile and one without, returning their ids"""
+    users = make_users((("withprofile", UserRole.DOCTOR), ("noprofile", UserRole.DOCTOR)), last_name="Doctor")
+
+    test_db.add(Doctor(user_id=users[0].id, doctor_id="D-001", qualifications=["MD"]))
+    test_db.commit()
+    user_ids = [user.id for user in users]
+    test_db.expunge_all()
+    return user_ids
+
+
+def test_get_doctors_loads_profiles_eagerly(test_db, test_user, doctor_user_ids):
+    """Test that listing doctors needs no lazy loads"""
+    response = get_doctors(
+        page=1, page_size=10, search=None, include_deleted=False, cursor=None,
+        db=test_db, current_user=test_user
+    )
+    result = json.loads(response.body)
+
+    assert result["total"] == 2
+    profiles = {doctor["username"]: doctor["doctor_id"] for doctor in result["doctors"]}
+    assert profiles == {"withprofile": "D-001", "noprofile": None}
+
+
+def test_get_doctor_loads_profile_eagerly(test_db, test_user, doctor_user_ids):
+    """Test that reading a single doctor needs no lazy loads"""
+    result = get_doctor(
+        user_id=doctor_user_ids[0], response=Response(), if_none_match=None,
+        db=test_db, current_user=test_user
+    )
+
+    assert result.profile_completed
+    assert result.doctor_id == "D-001"
+
+
+def test_get_doctor_returns_304_for_matching_etag(test_db, test_user, doctor_user_ids):
+    """Test that a revalidation with the current ETag gets an empty 304"""
+    response = Response()
+    get_doctor(
+        user_id=doctor_user_ids[0], response=response, if_none_match=None,
+        db=test_db, current_user=test_user
+    )
+    etag = response.headers["ETag"]
+
+    result = get_doctor(
+        user_id=doctor_user_ids[0], response=Response(), if_none_match=etag,
+        db=test_db, current_user=test_user
+    )
+    assert result.status_code == 304
+    assert result.body == b""
+
+    stale = get_doctor(
+        user_id=doctor_user_ids[1], response=Response(), if_none_match=etag,
+        db=test_db, current_user=test_user
+    )
+    assert stale.username == "noprofile"
+
+
+def test_get_doctors_query_count_is_constant(test_db, test_user, doctor_user_ids, executed_statements):
+    """Test that a page of doctors costs the same number of queries at any size"""
+    get_doctors(
+        page=1, page_size=10, search=None, include_deleted=False, cursor=None,
+        db=test_db, current_user=test_user
+    )
+
+    assert len(executed_statements) <= 2
+
+
+def test_get_doctors_page_matches_response_model(test_db, test_user, doctor_user_ids):
+    """Test that the directly serialized page still satisfies PaginatedDoctorsResponse"""
+    response = get_doctors(
+        page=1, page_size=10, search=None, include_deleted=False, cursor=None,
+        db=test_db, current_user=test_user
+    )
+    result = json.loads(response.body)
+
+    PaginatedDoctorsResponse.model_validate(result)
+    assert set(result["doctors"][0]) == set(DoctorResponse.model_fields)
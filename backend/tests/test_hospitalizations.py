@@ -0,0 +1,111 @@
+"""
+Tests for the hospitalization endpoints.
+Handlers are called directly with the test session, which raises on lazy loads.
+"""
+
+import json
+
+import pytest
+from datetime import datetime
+from core.cache import hospitalization_cache, invalidate_hospitalizations
+from models import Doctor, Hospitalization, Patient, UserRole
+from routers.hospitalizations import get_hospitalization, get_hospitalizations
+
+
+@pytest.fixture
+def hospitalization_id(test_db, make_users):
+    """Create a patient hospitalization with two assigned doctors, returning its id"""
+    users = make_users((("patient", UserRole.PATIENT), ("doc1", UserRole.DOCTOR), ("doc2", UserRole.DOCTOR)))
+
+    patient = Patient(user_id=users[0].id)
+    doctors = [
+        Doctor(user_id=user.id, doctor_id=f"D-{user.id}", qualifications=["MD"])
+        for user in users[1:]
+    ]
+    hospitalization = Hospitalization(
+        patient=patient,
+        admission_date=datetime(2025, 1, 1),
+        diagnosis="Observation",
+        doctors=doctors
+    )
+    test_db.add(hospitalization)
+    test_db.flush()
+    hospitalization_id = hospitalization.id
+    test_db.commit()
+    test_db.expunge_all()
+    hospitalization_cache.clear()
+    return hospitalization_id
+
+
+def test_get_hospitalizations_loads_doctors_eagerly(test_db, test_user, hospitalization_id):
+    """Test that listing hospitalizations needs no lazy loads"""
+    response = get_hospitalizations(
+        page=1, page_size=10, patient_id=None, active_only=False, search=None, cursor=None,
+        db=test_db, current_user=test_user
+    )
+    result = json.loads(response.body)
+
+    assert result["total"] == 1
+    hospitalization = result["hospitalizations"][0]
+    assert hospitalization["id"] == hospitalization_id
+    assert hospitalization["patient_first_name"] == "Patient"
+    assert sorted(doctor["first_name"] for doctor in hospitalization["doctors"]) == ["Doc1", "Doc2"]
+
+
+def test_get_hospitalizations_query_count_is_constant(test_db, test_user, hospitalization_id, executed_statements):
+    """Test that a page of hospitalizations costs one row query and one doctor query"""
+    get_hospitalizations(
+        page=1, page_size=10, patient_id=None, active_only=False, search=None, cursor=None,
+        db=test_db, current_user=test_user
+    )
+
+    # Count, rows joined with patient users, then doctors with their users
+    assert len(executed_statements) == 3
+
+
+def test_get_hospitalization_loads_doctors_eagerly(test_db, test_user, hospitalization_id):
+    """Test that reading a single hospitalization needs no lazy loads"""
+    response = get_hospitalization(
+        hospitalization_id=hospitalization_id, db=test_db, current_user=test_user
+    )
+    result = json.loads(response.body)
+
+    assert result["patient_last_name"] == "Example"
+    assert len(result["doctors"]) == 2
+
+
+def test_get_hospitalization_serves_cached_body(test_db, test_user, hospitalization_id):
+    """Test that a repeat read is served from the cache until a write invalidates it"""
+    first = get_hospitalization(
+        hospitalization_id=hospitalization_id, db=test_db, current_user=test_user
+    )
+    test_db.query(Hospitalization).filter(Hospitalization.id == hospitalization_id).update({"diagnosis": "Changed"})
+    test_db.commit()
+
+    cached = get_hospitalization(
+        hospitalization_id=hospitalization_id, db=test_db, current_user=test_user
+    )
+    assert cached.body == first.body
+
+    invalidate_hospitalizations()
+    fresh = get_hospitalization(
+        hospitalization_id=hospitalization_id, db=test_db, current_user=test_user
+    )
+    assert json.loads(fresh.body)["diagnosis"] == "Changed"
+
+
+def test_get_hospitalizations_cursor_continues_after_last_row(test_db, test_user, hospitalization_id):
+    """Test that the next_cursor of a full page seeks past the rows already returned"""
+    first = json.loads(get_hospitalizations(
+        page=1, page_size=1, patient_id=None, active_only=False, search=None, cursor=None,
+        db=test_db, current_user=test_user
+    ).body)
+    assert first["next_cursor"] is not None
+
+    second = json.loads(get_hospitalizations(
+        page=1, page_size=1, patient_id=None, active_only=False, search=None, cursor=first["next_cursor"],
+        db=test_db, current_user=test_user
+    ).body)
+    assert second["hospitalizations"] == []
+    assert second["total"] is None
+    assert second["next_cursor"] is None
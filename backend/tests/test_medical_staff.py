@@ -0,0 +1,74 @@
+"""
+Tests for the medical staff listing endpoint.
+Handlers are called directly with the test session, which raises on lazy loads.
+"""
+
+import json
+
+import pytest
+from core.cache import list_count_cache, medical_staff_list_cache
+from models import MedicalStaff, UserRole
+from routers.medical_staff import get_medical_staff_list
+
+
+@pytest.fixture
+def staff_emails(test_db, test_user, make_users):
+    """Create four more staff users, the first with a profile, returning all staff emails"""
+    users = make_users(
+        [(f"nurse{i}", UserRole.MEDICAL_STAFF) for i in range(2)]
+        + [(f"desk{i}", UserRole.RECEPTIONIST) for i in range(2)]
+    )
+    test_db.add(MedicalStaff(user_id=users[0].id, job_title="Nurse", department="ER"))
+    test_db.commit()
+    emails = [test_user.email] + [user.email for user in users]
+    test_db.expunge_all()
+    list_count_cache.clear()
+    medical_staff_list_cache.clear()
+    return emails
+
+
+def list_staff(test_db, current_user, page=1, page_size=10, cursor=None):
+    """Call get_medical_staff_list without a search and return the decoded body"""
+    response = get_medical_staff_list(
+        page=page, page_size=page_size, search=None, cursor=cursor,
+        db=test_db, current_user=current_user
+    )
+    return json.loads(response.body)
+
+
+def test_get_medical_staff_cursor_visits_every_row_once(test_db, test_user, staff_emails):
+    """Test that following next_cursor walks the whole listing without gaps or repeats"""
+    result = list_staff(test_db, test_user, page_size=2)
+    seen = [item["email"] for item in result["items"]]
+    while result["next_cursor"] is not None:
+        result = list_staff(test_db, test_user, page_size=2, cursor=result["next_cursor"])
+        assert result["total"] is None
+        seen.extend(item["email"] for item in result["items"])
+
+    assert sorted(seen) == sorted(staff_emails)
+    assert len(seen) == len(set(seen))
+
+
+def test_get_medical_staff_past_last_page_reports_total(test_db, test_user, staff_emails):
+    """Test that a page past the end is empty but still counts the matches"""
+    result = list_staff(test_db, test_user, page=9, page_size=2)
+
+    assert result["items"] == []
+    assert result["total"] == 5
+    assert result["total_pages"] == 3
+
+
+def test_get_medical_staff_total_is_cached_until_user_write(test_db, test_user, make_users, staff_emails):
+    """Test that the total is reused between pages and dropped when a user is written"""
+    count_key = ("medical_staff", None)
+    assert list_staff(test_db, test_user)["total"] == 5
+    assert list_count_cache.get(count_key) == 5
+
+    # Skip the serialized page so the count cache is what gets read
+    list_count_cache.set(count_key, 42)
+    medical_staff_list_cache.clear()
+    assert list_staff(test_db, test_user)["total"] == 42
+
+    make_users([("nurse9", UserRole.MEDICAL_STAFF)])
+    assert list_count_cache.get(count_key) is None
+    assert list_staff(test_db, test_user)["total"] == 6
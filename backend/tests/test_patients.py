@@ -0,0 +1,79 @@
+"""
+Tests for the patient listing endpoint.
+Handlers are called directly with the test session, which raises on lazy loads.
+"""
+
+import json
+
+import pytest
+from core.cache import list_count_cache
+from models import Patient, UserRole
+from routers.patients import get_patients
+from schemas import PaginatedPatientsResponse, PatientResponse
+
+
+@pytest.fixture
+def patient_usernames(test_db, make_users):
+    """Create five patients, the first with a completed profile, returning their usernames"""
+    users = make_users([(f"patient{i}", UserRole.PATIENT) for i in range(5)])
+    test_db.add(Patient(user_id=users[0].id, medical_record_number="MRN-0"))
+    test_db.commit()
+    usernames = [user.username for user in users]
+    test_db.expunge_all()
+    list_count_cache.clear()
+    return usernames
+
+
+def list_patients(test_db, current_user, page=1, page_size=10, cursor=None):
+    """Call get_patients with the plain listing filters and return the decoded body"""
+    response = get_patients(
+        page=page, page_size=page_size, search=None, include_deleted=False,
+        hospitalization_status=None, cursor=cursor, db=test_db, current_user=current_user
+    )
+    return json.loads(response.body)
+
+
+def test_get_patients_cursor_visits_every_row_once(test_db, test_user, patient_usernames):
+    """Test that following next_cursor walks the whole listing without gaps or repeats"""
+    result = list_patients(test_db, test_user, page_size=2)
+    seen = [patient["username"] for patient in result["patients"]]
+    while result["next_cursor"] is not None:
+        result = list_patients(test_db, test_user, page_size=2, cursor=result["next_cursor"])
+        assert result["total"] is None
+        seen.extend(patient["username"] for patient in result["patients"])
+
+    assert sorted(seen) == sorted(patient_usernames)
+    assert len(seen) == len(set(seen))
+
+
+def test_get_patients_past_last_page_reports_total(test_db, test_user, patient_usernames):
+    """Test that a page past the end is empty but still counts the matches"""
+    result = list_patients(test_db, test_user, page=9, page_size=2)
+
+    assert result["patients"] == []
+    assert result["total"] == 5
+    assert result["total_pages"] == 3
+
+
+def test_get_patients_total_is_cached_until_user_write(test_db, test_user, make_users, patient_usernames):
+    """Test that the total is reused between pages and dropped when a user is written"""
+    count_key = ("patients", None, False)
+    assert list_patients(test_db, test_user)["total"] == 5
+    assert list_count_cache.get(count_key) == 5
+
+    list_count_cache.set(count_key, 42)
+    assert list_patients(test_db, test_user)["total"] == 42
+
+    make_users([("patient5", UserRole.PATIENT)])
+    assert list_count_cache.get(count_key) is None
+    assert list_patients(test_db, test_user)["total"] == 6
+
+
+def test_get_patients_page_matches_response_model(test_db, test_user, patient_usernames):
+    """Test that the directly serialized page still satisfies PaginatedPatientsResponse"""
+    result = list_patients(test_db, test_user)
+
+    page = PaginatedPatientsResponse.model_validate(result)
+    assert set(result["patients"][0]) == set(PatientResponse.model_fields)
+    completed = [patient for patient in page.patients if patient.profile_completed]
+    assert [patient.medical_record_number for patient in completed] == ["MRN-0"]